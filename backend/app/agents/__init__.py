@@ -3,4 +3,53 @@ from app.agents.osha_mapper import OSHAMapper
 from app.agents.report_generator import ReportGenerator
 from app.agents.voice_agent import VoiceAgent
 
-__all__ = ["ImageAnalyzer", "OSHAMapper", "ReportGenerator", "VoiceAgent"]
+# ─── Lazy per-process singletons ─────────────────────────────────────────────
+# Agents wrap boto3 Bedrock clients; constructing one re-runs botocore's
+# endpoint resolution and credential chain and starts a cold connection
+# pool. Reusing a single instance per process keeps the pool (and the
+# agents' response caches) warm across pipeline runs.
+
+_analyzer: ImageAnalyzer | None = None
+_mapper: OSHAMapper | None = None
+_generator: ReportGenerator | None = None
+_voice_agent: VoiceAgent | None = None
+
+
+def get_image_analyzer() -> ImageAnalyzer:
+    global _analyzer
+    if _analyzer is None:
+        _analyzer = ImageAnalyzer()
+    return _analyzer
+
+
+def get_osha_mapper() -> OSHAMapper:
+    global _mapper
+    if _mapper is None:
+        _mapper = OSHAMapper()
+    return _mapper
+
+
+def get_report_generator() -> ReportGenerator:
+    global _generator
+    if _generator is None:
+        _generator = ReportGenerator()
+    return _generator
+
+
+def get_voice_agent() -> VoiceAgent:
+    global _voice_agent
+    if _voice_agent is None:
+        _voice_agent = VoiceAgent()
+    return _voice_agent
+
+
+__all__ = [
+    "ImageAnalyzer",
+    "OSHAMapper",
+    "ReportGenerator",
+    "VoiceAgent",
+    "get_image_analyzer",
+    "get_osha_mapper",
+    "get_report_generator",
+    "get_voice_agent",
+]
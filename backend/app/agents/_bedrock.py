@@ -0,0 +1,108 @@
+"""
+Shared boto3 bedrock-runtime client.
+
+Each agent used to construct its own client in __init__, re-running the
+credential chain and endpoint resolution (~200-500ms) per instance.
+All agents now share one lazily-created client — boto3 clients are
+thread-safe — with a connection pool sized for concurrent fan-out.
+"""
+import itertools
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import boto3
+from botocore.config import Config
+
+from app.config import settings
+
+_lock = threading.Lock()
+_runtime = None
+_pool = None
+
+
+def _make_client(region: str):
+    return boto3.client(
+        "bedrock-runtime",
+        region_name=region,
+        aws_access_key_id=settings.aws_access_key_id or None,
+        aws_secret_access_key=settings.aws_secret_access_key or None,
+        config=Config(
+            # Adaptive mode backs off on ThrottlingException, so
+            # burst fan-out degrades to client-side rate limiting
+            # instead of failed requests
+            retries={"max_attempts": 10, "mode": "adaptive"},
+            connect_timeout=5,
+            read_timeout=120,
+            max_pool_connections=64,
+            tcp_keepalive=True,
+        ),
+    )
+
+
+def make_aws_client(service: str):
+    """
+    Client for an auxiliary AWS service (s3, bedrock control plane) that
+    carries the same settings-supplied credentials as the runtime client.
+    Deployments configured through settings rather than the ambient
+    credential chain would otherwise hit NoCredentialsError.
+    """
+    return boto3.client(
+        service,
+        region_name=settings.aws_region,
+        aws_access_key_id=settings.aws_access_key_id or None,
+        aws_secret_access_key=settings.aws_secret_access_key or None,
+    )
+
+
+class _RotatingClient:
+    """
+    Proxy that hands each attribute access to the next client in the
+    region cycle. Agents are per-process singletons that cache the
+    return value of get_bedrock_runtime() at construction, so rotation
+    has to happen per *call* — every `client.converse_stream(...)`
+    lookup picks the next region — rather than per construction, which
+    would pin the whole fan-out to whichever region came up first.
+    """
+
+    def __init__(self, clients):
+        self._cycle = itertools.cycle(clients)
+
+    def __getattr__(self, name):
+        return getattr(next(self._cycle), name)
+
+
+def get_bedrock_runtime():
+    """
+    Return a process-wide bedrock-runtime client.
+
+    With bedrock_regions configured, one client per region is created and
+    calls rotate round-robin across them — each region has its own TPM
+    quota, so heavy image fan-out stops hitting one region's throttle.
+    With the default single region this returns a plain client.
+    """
+    global _runtime
+    if _runtime is None:
+        with _lock:
+            if _runtime is None:
+                regions_raw = settings.bedrock_regions or settings.aws_region
+                regions = [r.strip() for r in regions_raw.split(",") if r.strip()]
+                clients = [_make_client(r) for r in regions]
+                _runtime = clients[0] if len(clients) == 1 else _RotatingClient(clients)
+    return _runtime
+
+
+def get_bedrock_pool() -> ThreadPoolExecutor:
+    """
+    Dedicated executor for blocking Bedrock work (bidirectional streams,
+    image fan-out). The default asyncio executor caps at min(32, cpu+4)
+    threads, which concurrent voice sessions exhaust — new sessions then
+    queue behind old ones.
+    """
+    global _pool
+    if _pool is None:
+        with _lock:
+            if _pool is None:
+                workers = settings.max_parallel_bedrock or (os.cpu_count() or 1) * 5
+                _pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="bedrock")
+    return _pool
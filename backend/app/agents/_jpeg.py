@@ -0,0 +1,29 @@
+"""
+Shared JPEG encoding helper.
+
+Prefers libjpeg-turbo via PyTurboJPEG — its SIMD DCT/Huffman paths are
+typically 2-4x faster than the libjpeg build OpenCV wheels link against —
+and falls back to cv2.imencode when the native library isn't installed.
+"""
+import logging
+
+import cv2
+
+logger = logging.getLogger(__name__)
+
+try:
+    from turbojpeg import TurboJPEG
+    _turbo = TurboJPEG()
+except Exception:   # package missing or native libturbojpeg not found
+    _turbo = None
+
+
+def encode_jpeg(frame, quality: int = 85) -> "bytes | None":
+    """Encode a BGR frame to JPEG bytes. Returns None if encoding fails."""
+    if _turbo is not None:
+        try:
+            return _turbo.encode(frame, quality=quality)
+        except Exception as e:
+            logger.warning(f"TurboJPEG encode failed, falling back to OpenCV: {e}")
+    ok, buf = cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, quality])
+    return buf.tobytes() if ok else None
@@ -2,18 +2,27 @@
 Agent 1 — Image Analyzer (Amazon Nova Pro)
 Looks at each photo like an experienced safety inspector and returns raw observations.
 """
-import base64
+import asyncio
+import hashlib
 import json
 import logging
+import mmap
+import re
+from collections import OrderedDict
+from io import BytesIO
 from pathlib import Path
 
-import boto3
+import orjson
 from botocore.exceptions import ClientError
+from PIL import Image
 
+from app.agents._bedrock import get_bedrock_pool, get_bedrock_runtime
 from app.config import settings
 
 logger = logging.getLogger(__name__)
 
+_JSON_DECODER = json.JSONDecoder()
+
 SUPPORTED_FORMATS = {".jpg": "jpeg", ".jpeg": "jpeg", ".png": "png", ".gif": "gif", ".webp": "webp"}
 
 INSPECTOR_PROMPT = """You are an expert OSHA construction site safety inspector with 20+ years of field experience.
@@ -62,16 +71,59 @@ Set it to false if the body part is not in frame, obscured, or not clearly visib
 If you see NO violations, return: []
 Return ONLY the JSON array. No preamble, no explanation outside the JSON."""
 
+# Part of the response cache key — bumps automatically whenever the prompt changes
+PROMPT_HASH = hashlib.sha256(INSPECTOR_PROMPT.encode("utf-8")).hexdigest()[:8]
+
+# High-hallucination PPE keywords and the body-part words that MUST appear in
+# the observation text, precompiled into one alternation so each observation
+# costs a single scan instead of a nested keyword × word loop.
+_PPE_KEYWORD_RE = re.compile(
+    r"(?P<glove>glove)|(?P<boot>boot)|(?P<shoe>shoe)|(?P<goggle>goggle)"
+    r"|(?P<eye_protection>eye protection)|(?P<face_shield>face shield)|(?P<hearing>hearing)"
+)
+_REQUIRED_BODY_PART_RE = {
+    "glove":          re.compile(r"hand|finger"),
+    "boot":           re.compile(r"foot|feet|ankle"),
+    "shoe":           re.compile(r"foot|feet|ankle"),
+    "goggle":         re.compile(r"eye|face"),
+    "eye_protection": re.compile(r"eye|face"),
+    "face_shield":    re.compile(r"eye|face"),
+    "hearing":        re.compile(r"ear"),
+}
+
+CACHE_MAX_ENTRIES = 256
+
+# Images per Converse request when analyzing an upload set — amortizes
+# prompt prefill and the network round-trip across the group
+MULTI_IMAGE_BATCH = 4
+
+# Nova Pro downsamples internally to ~1568px on the long edge — anything
+# bigger just wastes upload time, so we pre-shrink phone photos here.
+# Operators can trade detail for payload size via settings.max_image_edge.
+MAX_IMAGE_EDGE = settings.max_image_edge
+JPEG_QUALITY = 85
+
+# Static Converse payload fragments — built once at import so each call
+# only assembles the image block
+_PROMPT_CONTENT = {"text": INSPECTOR_PROMPT}
+_INFERENCE_CONFIG = {"maxTokens": 2048, "temperature": 0.1}
+
+# Appended to the prompt when several images share one request, so findings
+# can be attributed back to their frame
+BATCH_PROMPT_NOTE = (
+    "\n\nYou are analyzing {count} images in this request. Apply all the rules above to"
+    ' each image independently, and add an "image_number" field (1-based, in the order'
+    " the images appear) to every finding so it can be attributed to its image."
+)
+
 
 class ImageAnalyzer:
     def __init__(self):
-        self.client = boto3.client(
-            "bedrock-runtime",
-            region_name=settings.aws_region,
-            aws_access_key_id=settings.aws_access_key_id or None,
-            aws_secret_access_key=settings.aws_secret_access_key or None,
-        )
+        self.client = get_bedrock_runtime()
         self.model_id = settings.nova_pro_model_id
+        # Exact-match response cache: identical image bytes + model + prompt
+        # skip Bedrock entirely (common during re-runs and repeat uploads)
+        self._cache: "OrderedDict[str, list[dict]]" = OrderedDict()
 
     def analyze_image(self, image_path: str) -> list[dict]:
         """Analyze a single image and return raw safety observations."""
@@ -79,42 +131,168 @@ class ImageAnalyzer:
         ext = path.suffix.lower()
         image_format = SUPPORTED_FORMATS.get(ext, "jpeg")
 
-        with open(image_path, "rb") as f:
-            image_bytes = f.read()
-
-        image_b64 = base64.standard_b64encode(image_bytes).decode("utf-8")
-
-        request_body = {
-            "messages": [
-                {
-                    "role": "user",
-                    "content": [
-                        {
-                            "image": {
-                                "format": image_format,
-                                "source": {"bytes": image_b64},
-                            }
-                        },
-                        {"text": INSPECTOR_PROMPT},
-                    ],
-                }
-            ],
-            "inferenceConfig": {
-                "maxTokens": 2048,
-                "temperature": 0.1,
-            },
-        }
+        # mmap instead of f.read(): hashing and Pillow decode read pages
+        # straight from the OS cache, with no multi-MB copy into the heap.
+        with open(image_path, "rb") as f, mmap.mmap(
+            f.fileno(), 0, access=mmap.ACCESS_READ
+        ) as mm:
+            cache_key = f"{hashlib.sha256(mm).hexdigest()}:{self.model_id}:{PROMPT_HASH}"
+            cached = self._cache.get(cache_key)
+            if cached is not None:
+                self._cache.move_to_end(cache_key)
+                logger.info(f"Image analysis cache hit for {path.name}")
+                return [dict(obs) for obs in cached]
+
+            image_bytes, image_format = self._downscale(mm, image_format)
+            return self._converse(image_path, cache_key, image_bytes, image_format)
+
+    def analyze_image_bytes(
+        self, image_bytes: bytes, image_format: str = "jpeg", label: str = "frame"
+    ) -> list[dict]:
+        """
+        Analyze an already-encoded in-memory image.
+
+        Used by the realtime monitor, which encodes frames with
+        cv2.imencode and has no reason to round-trip them through disk.
+        """
+        cache_key = f"{hashlib.sha256(image_bytes).hexdigest()}:{self.model_id}:{PROMPT_HASH}"
+        cached = self._cache.get(cache_key)
+        if cached is not None:
+            self._cache.move_to_end(cache_key)
+            logger.info(f"Image analysis cache hit for {label}")
+            return [dict(obs) for obs in cached]
+
+        image_bytes, image_format = self._downscale(BytesIO(image_bytes), image_format)
+        return self._converse(label, cache_key, image_bytes, image_format)
+
+    def analyze_images_batch(
+        self,
+        images: list[bytes],
+        image_format: str = "jpeg",
+        image_formats: list[str] | None = None,
+    ) -> list[list[dict]]:
+        """
+        Analyze several in-memory images with one Bedrock request.
+
+        Nova accepts multiple image blocks per message, so a micro-batch
+        of K frames amortizes one network round-trip over all of them.
+        Returns one observation list per input image, in order; cached
+        images are served locally and only misses go on the wire.
+        `image_formats` overrides `image_format` per image for mixed
+        upload sets.
+        """
+        results: list = [None] * len(images)
+        misses: list[int] = []
+        keys: list[str] = []
+        for i, image_bytes in enumerate(images):
+            key = f"{hashlib.sha256(image_bytes).hexdigest()}:{self.model_id}:{PROMPT_HASH}"
+            keys.append(key)
+            cached = self._cache.get(key)
+            if cached is not None:
+                self._cache.move_to_end(key)
+                results[i] = [dict(obs) for obs in cached]
+            else:
+                misses.append(i)
+
+        if misses:
+            grouped = self._converse_batch(
+                [images[i] for i in misses],
+                image_format,
+                [image_formats[i] for i in misses] if image_formats else None,
+            )
+            for local, i in enumerate(misses):
+                self._cache[keys[i]] = [dict(obs) for obs in grouped[local]]
+                while len(self._cache) > CACHE_MAX_ENTRIES:
+                    self._cache.popitem(last=False)
+                results[i] = grouped[local]
+
+        return results
+
+    def _converse_batch(
+        self, images: list[bytes], image_format: str, image_formats: list[str] | None = None
+    ) -> list[list[dict]]:
+        """One Converse call carrying every image as its own content block."""
+        content = []
+        for i, image_bytes in enumerate(images):
+            fmt_in = image_formats[i] if image_formats else image_format
+            image_bytes, fmt = self._downscale(BytesIO(image_bytes), fmt_in)
+            content.append({"image": {"format": fmt, "source": {"bytes": image_bytes}}})
+        content.append({"text": INSPECTOR_PROMPT + BATCH_PROMPT_NOTE.format(count=len(images))})
+
+        converse_kwargs = {}
+        if settings.bedrock_latency_optimized:
+            converse_kwargs["performanceConfig"] = {"latency": "optimized"}
+
+        try:
+            response = self.client.converse_stream(
+                modelId=self.model_id,
+                messages=[{"role": "user", "content": content}],
+                inferenceConfig=_INFERENCE_CONFIG,
+                **converse_kwargs,
+            )
+            parts = []
+            for event in response["stream"]:
+                delta = event.get("contentBlockDelta")
+                if delta:
+                    parts.append(delta["delta"].get("text", ""))
+            observations = self._parse_json_array("".join(parts))
+        except ClientError as e:
+            logger.error(f"Bedrock error analyzing image batch: {e}")
+            raise
+
+        # Attribute each finding back to its image via the model-reported
+        # 1-based image_number; unattributable findings go to the first image
+        grouped: list[list[dict]] = [[] for _ in images]
+        for obs in observations:
+            number = obs.pop("image_number", 1)
+            idx = number - 1 if isinstance(number, int) and 1 <= number <= len(images) else 0
+            grouped[idx].append(obs)
+        return grouped
+
+    def _converse(self, image_path, cache_key, image_bytes, image_format) -> list[dict]:
+        # Converse API takes raw bytes — no base64 blow-up, no json.dumps
+        # of a multi-MB payload; boto3 serializes the bytes as binary.
+        messages = [
+            {
+                "role": "user",
+                "content": [
+                    {
+                        "image": {
+                            "format": image_format,
+                            "source": {"bytes": image_bytes},
+                        }
+                    },
+                    _PROMPT_CONTENT,
+                ],
+            }
+        ]
+
+        converse_kwargs = {}
+        if settings.bedrock_latency_optimized:
+            converse_kwargs["performanceConfig"] = {"latency": "optimized"}
 
         try:
-            response = self.client.invoke_model(
+            # Stream the completion so we accumulate tokens as they arrive
+            # instead of blocking on the full 2k-token response
+            response = self.client.converse_stream(
                 modelId=self.model_id,
-                body=json.dumps(request_body),
-                contentType="application/json",
-                accept="application/json",
+                messages=messages,
+                inferenceConfig=_INFERENCE_CONFIG,
+                **converse_kwargs,
             )
-            response_body = json.loads(response["body"].read())
-            output_text = response_body["output"]["message"]["content"][0]["text"]
-            return self._parse_json_array(output_text)
+            parts = []
+            for event in response["stream"]:
+                delta = event.get("contentBlockDelta")
+                if delta:
+                    parts.append(delta["delta"].get("text", ""))
+            output_text = "".join(parts)
+            observations = self._parse_json_array(output_text)
+
+            # Cache copies — callers mutate observations (image_index tagging)
+            self._cache[cache_key] = [dict(obs) for obs in observations]
+            while len(self._cache) > CACHE_MAX_ENTRIES:
+                self._cache.popitem(last=False)
+            return observations
 
         except ClientError as e:
             logger.error(f"Bedrock error analyzing {image_path}: {e}")
@@ -123,32 +301,103 @@ class ImageAnalyzer:
             logger.error(f"Error analyzing {image_path}: {e}")
             raise
 
+    @staticmethod
+    def _downscale(src, image_format: str) -> tuple[bytes, str]:
+        """
+        Shrink oversized images before upload.
+
+        A 12MP site photo is 4-8MB; the model resizes it down anyway, so
+        re-encoding to <=1568px JPEG q85 cuts the payload 5-10x with no
+        loss of analysis quality. Pillow decodes straight from the given
+        file-like source (an mmap or BytesIO); images already within
+        bounds pass through untouched.
+        """
+        try:
+            img = Image.open(src)
+            if max(img.size) <= MAX_IMAGE_EDGE:
+                src.seek(0)
+                return src.read(), image_format
+            img.thumbnail((MAX_IMAGE_EDGE, MAX_IMAGE_EDGE), Image.LANCZOS)
+            if img.mode not in ("RGB", "L"):
+                img = img.convert("RGB")
+            buf = BytesIO()
+            img.save(buf, "JPEG", quality=JPEG_QUALITY)
+            return buf.getvalue(), "jpeg"
+        except Exception as e:
+            logger.warning(f"Could not downscale image, sending original: {e}")
+            src.seek(0)
+            return src.read(), image_format
+
     def analyze_multiple(self, image_paths: list[str]) -> list[dict]:
-        """Analyze multiple images and combine all observations."""
-        all_observations = []
-        for idx, path in enumerate(image_paths):
+        """Analyze multiple images concurrently and combine all observations."""
+        return asyncio.run(self.analyze_multiple_async(image_paths))
+
+    async def analyze_multiple_async(self, image_paths: list[str]) -> list[dict]:
+        """
+        Analyze multiple images and combine all observations.
+
+        Images are grouped MULTI_IMAGE_BATCH per Converse request — Nova
+        takes several image blocks per message, so each group shares one
+        prompt prefill and network round-trip. The groups themselves fan
+        out over the bounded thread pool, so total time is roughly
+        max-of-groups rather than sum-of-calls.
+        """
+        if not image_paths:
+            return []
+
+        chunks = [
+            image_paths[i : i + MULTI_IMAGE_BATCH]
+            for i in range(0, len(image_paths), MULTI_IMAGE_BATCH)
+        ]
+
+        def _safe_analyze_group(paths: list[str]) -> list[list[dict]]:
             try:
-                observations = self.analyze_image(path)
+                images = []
+                formats = []
+                for p in paths:
+                    formats.append(SUPPORTED_FORMATS.get(Path(p).suffix.lower(), "jpeg"))
+                    images.append(Path(p).read_bytes())
+                return self.analyze_images_batch(images, image_formats=formats)
+            except Exception as e:
+                logger.warning(f"Skipping image group {[Path(p).name for p in paths]}: {e}")
+                return [[] for _ in paths]
+
+        loop = asyncio.get_running_loop()
+        pool = get_bedrock_pool()
+        results = await asyncio.gather(
+            *[loop.run_in_executor(pool, _safe_analyze_group, c) for c in chunks]
+        )
+
+        all_observations = []
+        idx = 0
+        for chunk_paths, grouped in zip(chunks, results):
+            for path, observations in zip(chunk_paths, grouped):
                 for obs in observations:
                     obs["image_index"] = idx
                     obs["image_path"] = path
                 all_observations.extend(observations)
                 logger.info(f"Image {idx + 1}/{len(image_paths)}: found {len(observations)} issues")
-            except Exception as e:
-                logger.warning(f"Skipping image {path}: {e}")
+                idx += 1
         return all_observations
 
     @staticmethod
     def _parse_json_array(text: str) -> list:
         start = text.find("[")
-        end = text.rfind("]") + 1
-        if start >= 0 and end > start:
+        if start < 0:
+            return []
+        try:
+            # Model is told to return only the array, so parse straight
+            # through with orjson — no rfind scan for the closing bracket
+            raw = orjson.loads(text[start:].rstrip())
+        except orjson.JSONDecodeError:
             try:
-                raw = json.loads(text[start:end])
-                return ImageAnalyzer._filter_observations(raw)
+                # raw_decode parses exactly one value and stops, tolerating
+                # any prose the model tacked on after the array
+                raw, _ = _JSON_DECODER.raw_decode(text, start)
             except json.JSONDecodeError:
                 logger.warning("Could not parse JSON from image analysis response")
-        return []
+                return []
+        return ImageAnalyzer._filter_observations(raw)
 
     @staticmethod
     def _filter_observations(observations: list) -> list:
@@ -162,21 +411,10 @@ class ImageAnalyzer:
         part — if it doesn't, the violation is dropped regardless of what
         the model reported.
         """
-        # Maps: PPE keyword → body-part words that MUST appear in observation text
-        REQUIRE_BODY_PART_IN_TEXT = {
-            "glove":          ["hand", "finger"],
-            "boot":           ["foot", "feet", "ankle"],
-            "shoe":           ["foot", "feet", "ankle"],
-            "goggle":         ["eye", "face"],
-            "eye protection": ["eye", "face"],
-            "face shield":    ["eye", "face"],
-            "hearing":        ["ear"],
-        }
-
         filtered = []
         for obs in observations:
             hazard = obs.get("hazard_type", "").upper()
-            obs_text = obs.get("observation", "").lower()
+            obs_text = obs.get("observation", "").casefold()
             body_part_visible = obs.get("body_part_visible", True)
 
             if hazard != "PPE":
@@ -190,17 +428,20 @@ class ImageAnalyzer:
 
             # For high-hallucination PPE items: require the body part word
             # to appear in the observation text. If the model says
-            # "worker not wearing gloves" without mentioning hands, it's guessing.
-            drop = False
-            for keyword, required_words in REQUIRE_BODY_PART_IN_TEXT.items():
-                if keyword in obs_text:
-                    if not any(w in obs_text for w in required_words):
-                        logger.info(f"Dropped inferred PPE ({keyword}, body part not mentioned): {obs_text[:70]}")
-                        drop = True
-                        break
-
-            if not drop:
-                filtered.append(obs)
+            # "worker not wearing gloves" without mentioning hands, it's
+            # guessing. Every keyword present must be confirmed — one
+            # unconfirmed item drops the whole observation, same as the
+            # original keyword × word loop.
+            dropped = False
+            for m in _PPE_KEYWORD_RE.finditer(obs_text):
+                if not _REQUIRED_BODY_PART_RE[m.lastgroup].search(obs_text):
+                    logger.info(f"Dropped inferred PPE ({m.lastgroup}, body part not mentioned): {obs_text[:70]}")
+                    dropped = True
+                    break
+            if dropped:
+                continue
+
+            filtered.append(obs)
 
         removed = len(observations) - len(filtered)
         if removed:
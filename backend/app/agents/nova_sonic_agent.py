@@ -6,8 +6,9 @@ Architecture:
   Nova Sonic (PCM 24kHz)  → this agent → WebSocket → Browser speaker
 
 The bidirectional stream runs in a thread-pool executor so it doesn't
-block the async FastAPI event loop.  Two asyncio Queues bridge the async
-WebSocket world with the synchronous boto3 stream.
+block the async FastAPI event loop.  A janus queue (async + sync ends
+of the same queue) feeds audio from the WebSocket handler straight to
+the synchronous boto3 stream; an asyncio Queue carries events back.
 
 Audio specs:
   Input  : PCM 16-bit mono 16 kHz (browser captures and sends this)
@@ -15,20 +16,29 @@ Audio specs:
 """
 
 import asyncio
-import base64
-import json
 import logging
 import queue
+import time
 import uuid
-from typing import AsyncGenerator
+from collections import deque
+from typing import AsyncGenerator, Callable
 
-import boto3
+import janus
+import orjson
+import pybase64
 from botocore.exceptions import ClientError
 
+from app.agents._bedrock import get_bedrock_pool, get_bedrock_runtime
 from app.config import settings
 
 logger = logging.getLogger(__name__)
 
+
+def _event(payload: dict) -> str:
+    """Serialize one stream event — orjson keeps up with per-chunk audio rates."""
+    return orjson.dumps(payload).decode("utf-8")
+
+
 INPUT_SAMPLE_RATE  = 16000   # Hz — browser sends this
 OUTPUT_SAMPLE_RATE = 24000   # Hz — Nova Sonic returns this
 
@@ -55,7 +65,8 @@ class NovaSonicSession:
 
     Usage:
         session = NovaSonicSession()
-        async for event in session.run(audio_in_queue):
+        # feed PCM via await session.feed_audio(chunk); None ends the turn
+        async for event in session.run():
             if event["type"] == "audio":
                 # send base64 PCM audio back to browser
             elif event["type"] == "text":
@@ -64,20 +75,45 @@ class NovaSonicSession:
 
     MODEL_ID = "amazon.nova-sonic-v1:0"
 
+    # Audio coalescing: browsers send 20-40ms PCM frames (~25-50 events/sec);
+    # batching adjacent chunks cuts per-event base64 + JSON framing work
+    # 5-10x without hurting endpointing.
+    AUDIO_FLUSH_BYTES   = 8192   # ~256ms at 16 kHz mono PCM16
+    AUDIO_FLUSH_SECONDS = 0.12
+
+    AUDIO_IDLE_TIMEOUT = 60      # give up after this long without audio
+
+    # Bound the uplink queue so a fast mic against a slow Bedrock stream
+    # backs up the producer instead of growing RSS without limit.
+    # 64 chunks ≈ 1.3 s of audio at 20 ms browser frames.
+    AUDIO_QUEUE_MAX = 64
+
     def __init__(self):
-        self._client = boto3.client(
-            "bedrock-runtime",
-            region_name=settings.aws_region,
-            aws_access_key_id=settings.aws_access_key_id or None,
-            aws_secret_access_key=settings.aws_secret_access_key or None,
-        )
+        self._client = get_bedrock_runtime()
+        self._prompt_name  = str(uuid.uuid4())
+        self._content_name = str(uuid.uuid4())
+        # janus exposes async and sync ends of one queue, so the WS handler
+        # feeds audio straight to the Bedrock worker thread — no per-chunk
+        # bridging coroutine needed. Must be created on a running loop.
+        self._audio: "janus.Queue[bytes | None]" = janus.Queue(maxsize=self.AUDIO_QUEUE_MAX)
+
+    def new_turn(self) -> None:
+        """
+        Reset per-turn state so one session object serves the next turn.
+
+        run() closes the audio queue when its stream ends, so a fresh
+        janus queue is required; prompt/content names must be unique per
+        Bedrock prompt. The boto3 client (and its warm connection pool)
+        carries over — that is the expensive part of construction.
+        """
         self._prompt_name  = str(uuid.uuid4())
         self._content_name = str(uuid.uuid4())
+        self._audio = janus.Queue(maxsize=self.AUDIO_QUEUE_MAX)
 
     # ─── Input event builders ─────────────────────────────────────────────────
 
     def _session_start(self) -> str:
-        return json.dumps({
+        return _event({
             "event": {
                 "sessionStart": {
                     "inferenceConfiguration": {
@@ -93,7 +129,7 @@ class NovaSonicSession:
         })
 
     def _prompt_start(self) -> str:
-        return json.dumps({
+        return _event({
             "event": {
                 "promptStart": {
                     "promptName": self._prompt_name,
@@ -115,7 +151,7 @@ class NovaSonicSession:
         })
 
     def _content_block_start(self) -> str:
-        return json.dumps({
+        return _event({
             "event": {
                 "contentBlockStart": {
                     "promptName":  self._prompt_name,
@@ -124,19 +160,21 @@ class NovaSonicSession:
             }
         })
 
-    def _audio_input(self, pcm_bytes: bytes) -> str:
-        return json.dumps({
+    def _audio_input(self, pcm: "bytes | bytearray | memoryview") -> str:
+        # b64encode reads any buffer — callers can hand over their
+        # accumulation bytearray directly, no bytes() copy first
+        return _event({
             "event": {
                 "audioInput": {
                     "promptName":  self._prompt_name,
                     "contentName": self._content_name,
-                    "content":     base64.b64encode(pcm_bytes).decode("utf-8"),
+                    "content":     pybase64.b64encode(pcm).decode("ascii"),
                 }
             }
         })
 
     def _content_block_end(self) -> str:
-        return json.dumps({
+        return _event({
             "event": {
                 "contentBlockEnd": {
                     "promptName":  self._prompt_name,
@@ -146,7 +184,7 @@ class NovaSonicSession:
         })
 
     def _prompt_end(self) -> str:
-        return json.dumps({
+        return _event({
             "event": {
                 "promptEnd": {
                     "promptName": self._prompt_name
@@ -155,7 +193,7 @@ class NovaSonicSession:
         })
 
     def _session_end(self) -> str:
-        return json.dumps({"event": {"sessionEnd": {}}})
+        return _event({"event": {"sessionEnd": {}}})
 
     # ─── Core streaming ───────────────────────────────────────────────────────
 
@@ -168,11 +206,35 @@ class NovaSonicSession:
         yield self._prompt_start()
         yield self._content_block_start()
 
+        buf = bytearray()
+        last_flush = last_audio = time.monotonic()
         while True:
-            chunk = sync_q.get(timeout=60)   # wait up to 60s for audio
+            try:
+                chunk = sync_q.get(timeout=self.AUDIO_FLUSH_SECONDS)
+            except queue.Empty:
+                if time.monotonic() - last_audio > self.AUDIO_IDLE_TIMEOUT:
+                    break
+                chunk = b""
             if chunk is None:
                 break
-            yield self._audio_input(chunk)
+            if chunk:
+                buf.extend(chunk)
+                last_audio = time.monotonic()
+
+            now = time.monotonic()
+            if buf and (
+                len(buf) >= self.AUDIO_FLUSH_BYTES
+                or now - last_flush >= self.AUDIO_FLUSH_SECONDS
+            ):
+                # The base64 encode consumes buf before we return, so the
+                # bytearray is handed over as-is and reused after clear()
+                # — capacity survives, no per-flush bytes() copy
+                yield self._audio_input(buf)
+                buf.clear()
+                last_flush = now
+
+        if buf:
+            yield self._audio_input(buf)
 
         yield self._content_block_end()
         yield self._prompt_end()
@@ -181,15 +243,16 @@ class NovaSonicSession:
     def _run_bedrock_stream(
         self,
         sync_audio_q: "queue.Queue[bytes | None]",
-        output_q: "asyncio.Queue",
+        emit: Callable,
         loop: asyncio.AbstractEventLoop,
     ) -> None:
         """
         Runs synchronously in a thread-pool executor.
-        Calls Nova Sonic via bidirectional stream and feeds results into output_q.
+        Calls Nova Sonic via bidirectional stream and hands results to
+        `emit` on the event loop.
         """
         def put(event: dict):
-            loop.call_soon_threadsafe(output_q.put_nowait, event)
+            loop.call_soon_threadsafe(emit, event)
 
         try:
             response = self._client.invoke_model_with_bidirectional_stream(
@@ -218,43 +281,68 @@ class NovaSonicSession:
         finally:
             put(None)   # sentinel — stream is done
 
-    async def run(
-        self, audio_in: "asyncio.Queue[bytes | None]"
-    ) -> AsyncGenerator[dict, None]:
+    def audio_backlogged(self) -> bool:
+        """True when the uplink queue is full and the next feed will block."""
+        return not self._audio.closed and self._audio.async_q.full()
+
+    async def feed_audio(self, pcm_bytes: "bytes | None") -> None:
         """
-        Async generator.  Feed audio chunks into audio_in, receive response events.
+        Feed one PCM 16-bit mono 16 kHz chunk into the session.
+        Pass None to signal end of audio (closes the stream).
+        Blocks (with backpressure) while the queue is full.
+
+        Audio arriving after the stream already ended server-side (idle
+        timeout, Bedrock error) is dropped: run() has closed the queue by
+        then, and raising here would tear down the whole WS connection
+        when the turn should just end and the next one start fresh.
+        """
+        if self._audio.closed:
+            return
+        try:
+            await self._audio.async_q.put(pcm_bytes)
+        except RuntimeError:
+            pass  # run() closed the queue between the check and the put
 
-        audio_in items:
-            bytes  — PCM 16-bit mono 16 kHz chunk
-            None   — signals end of audio (closes the stream)
+    async def run(self) -> AsyncGenerator[dict, None]:
+        """
+        Async generator.  Feed audio chunks via feed_audio(), receive response events.
 
         Yields dicts:
             {"type": "text",  "content": "transcript text"}
             {"type": "audio", "content": "<base64 PCM 24kHz>"}
             {"type": "error", "content": "error message"}
         """
-        loop       = asyncio.get_running_loop()
-        output_q   = asyncio.Queue()
-        sync_audio = queue.Queue()
-
-        # Bridge asyncio → sync queue for the thread-pool executor
-        async def drain_audio():
-            while True:
-                chunk = await audio_in.get()
-                sync_audio.put(chunk)
-                if chunk is None:
-                    break
+        loop = asyncio.get_running_loop()
+
+        # Single-producer/single-consumer and both ends touch the loop
+        # thread (the worker emits via call_soon_threadsafe), so a plain
+        # deque plus one Event replaces asyncio.Queue — one fewer lock
+        # acquire and coroutine wake per audio chunk, and a burst of
+        # events drains in one wake-up.
+        out_buf: deque = deque()
+        out_ready = asyncio.Event()
+
+        def emit(event):
+            out_buf.append(event)
+            out_ready.set()
 
-        drain_task   = asyncio.create_task(drain_audio())
         stream_future = loop.run_in_executor(
-            None, self._run_bedrock_stream, sync_audio, output_q, loop
+            get_bedrock_pool(), self._run_bedrock_stream, self._audio.sync_q, emit, loop
         )
 
-        while True:
-            event = await output_q.get()
-            if event is None:
-                break
-            yield event
+        done = False
+        while not done:
+            await out_ready.wait()
+            # Clear before draining — anything appended mid-drain re-sets
+            # the event, so no wake-up is lost
+            out_ready.clear()
+            while out_buf:
+                event = out_buf.popleft()
+                if event is None:
+                    done = True
+                    break
+                yield event
 
-        await drain_task
         await stream_future
+        self._audio.close()
+        await self._audio.wait_closed()
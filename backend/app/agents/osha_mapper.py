@@ -3,16 +3,24 @@ Agent 2 — OSHA Mapper (Amazon Nova Lite)
 Takes raw observations and maps each one to the exact OSHA regulation,
 severity level, and plain-English remediation guidance.
 """
+import asyncio
+import hashlib
 import json
 import logging
+import time
+import uuid
+from collections import OrderedDict
 
-import boto3
+import orjson
 from botocore.exceptions import ClientError
 
+from app.agents._bedrock import get_bedrock_pool, get_bedrock_runtime, make_aws_client
 from app.config import settings
 
 logger = logging.getLogger(__name__)
 
+_JSON_DECODER = json.JSONDecoder()
+
 SYSTEM_PROMPT = """You are a certified OSHA compliance specialist for the construction industry.
 Map raw safety observations to specific OSHA 29 CFR regulations with precision.
 
@@ -50,26 +58,270 @@ MEDIUM   — Significant violation; injury possible but not imminent.
 LOW      — Minor or administrative violation; low injury probability."""
 
 
+class OSHAMapperCache:
+    """
+    Exact-match cache for per-observation OSHA mappings.
+
+    Construction inspections keep producing the same observations
+    ("worker without hard hat in foreground"), and at temperature 0.1 the
+    mapping for a given observation is deterministic enough to reuse.
+    Keys are sha256 over the canonicalized (hazard_type, observation)
+    pair; entries expire after a TTL and the oldest are LRU-evicted.
+    """
+
+    def __init__(self, max_entries: int = 2048, ttl_seconds: int = 86400):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, tuple[float, dict]]" = OrderedDict()
+
+    @staticmethod
+    def key_for(obs: dict) -> str:
+        canonical = json.dumps(
+            {
+                "hazard_type": obs.get("hazard_type", ""),
+                "observation": obs.get("observation", ""),
+            },
+            sort_keys=True,
+        )
+        return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> dict | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        stored_at, mapping = entry
+        if time.time() - stored_at > self.ttl_seconds:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return dict(mapping)
+
+    def set(self, key: str, mapping: dict) -> None:
+        self._entries[key] = (time.time(), dict(mapping))
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+
 class OSHAMapper:
     def __init__(self):
-        self.client = boto3.client(
-            "bedrock-runtime",
-            region_name=settings.aws_region,
-            aws_access_key_id=settings.aws_access_key_id or None,
-            aws_secret_access_key=settings.aws_secret_access_key or None,
-        )
+        self.client = get_bedrock_runtime()
         self.model_id = settings.nova_lite_model_id
+        self.cache = OSHAMapperCache()
 
     def map_violations(self, observations: list[dict]) -> list[dict]:
         """Map raw observations to OSHA codes with severity and remediation."""
         if not observations:
             return []
 
-        obs_text = json.dumps(observations, indent=2)
+        # Serve repeat observations from the cache, only send misses to Bedrock
+        results: list[dict | None] = [None] * len(observations)
+        misses: list[tuple[int, dict]] = []
+        miss_keys: list[str] = []
+        for i, obs in enumerate(observations):
+            key = OSHAMapperCache.key_for(obs)
+            hit = self.cache.get(key)
+            if hit is not None:
+                hit["observation_index"] = i
+                hit["original_observation"] = obs.get("observation", hit.get("original_observation"))
+                hit["image_index"] = obs.get("image_index", hit.get("image_index"))
+                results[i] = hit
+            else:
+                misses.append((i, obs))
+                miss_keys.append(key)
+
+        if len(misses) < len(observations):
+            logger.info(
+                f"OSHA mapping cache: {len(observations) - len(misses)}/{len(observations)} hits"
+            )
+
+        if misses:
+            mapped = asyncio.run(self._map_misses_async([obs for _, obs in misses]))
+            for local, item in enumerate(mapped):
+                if item is None:
+                    continue
+                i, obs = misses[local]
+                item["observation_index"] = i
+                item.setdefault("original_observation", obs.get("observation"))
+                item.setdefault("image_index", obs.get("image_index"))
+                results[i] = item
+                self.cache.set(miss_keys[local], item)
+
+        return [r for r in results if r is not None]
+
+    async def _map_misses_async(self, observations: list[dict]) -> list:
+        """
+        Fan observations out as one Bedrock call each over the shared pool.
+
+        One mega-prompt made output tokens (and therefore latency) scale
+        with list length, and mapping quality degraded on long lists.
+        Per-observation calls keep wall time near single-item latency and
+        return positionally, so no index bookkeeping from the model.
+        """
+
+        def _safe_map(obs: dict) -> dict | None:
+            try:
+                mapped = self._invoke_mapping([obs], max_tokens=512)
+                return mapped[0] if mapped else None
+            except Exception as e:
+                logger.warning(f"OSHA mapping failed for observation: {e}")
+                return None
+
+        loop = asyncio.get_running_loop()
+        pool = get_bedrock_pool()
+        return await asyncio.gather(
+            *[loop.run_in_executor(pool, _safe_map, obs) for obs in observations]
+        )
+
+    def _invoke_mapping(self, observations: list[dict], max_tokens: int = 4096) -> list[dict]:
+        """Single synchronous Converse call over the given observations."""
+        prompt = self._build_prompt(observations)
+
+        converse_kwargs = {}
+        if settings.bedrock_latency_optimized:
+            converse_kwargs["performanceConfig"] = {"latency": "optimized"}
+
+        try:
+            # Stream the completion so we accumulate tokens as they arrive
+            # instead of blocking on the full response. The cachePoint marks
+            # the static system prompt for Bedrock prompt caching — repeated
+            # calls reuse its KV prefill instead of re-processing ~1.5KB of
+            # regulation text each time.
+            response = self.client.converse_stream(
+                modelId=self.model_id,
+                system=[{"text": SYSTEM_PROMPT}, {"cachePoint": {"type": "default"}}],
+                messages=[{"role": "user", "content": [{"text": prompt}]}],
+                inferenceConfig={"maxTokens": max_tokens, "temperature": 0.1},
+                **converse_kwargs,
+            )
+            parts = []
+            for event in response["stream"]:
+                delta = event.get("contentBlockDelta")
+                if delta:
+                    parts.append(delta["delta"].get("text", ""))
+            return self._parse_json_array("".join(parts))
+
+        except ClientError as e:
+            logger.error(f"Bedrock error in OSHA mapping: {e}")
+            raise
+
+    def map_violations_batch(self, observations: list[dict], threshold: int = None) -> list[dict]:
+        """
+        Map observations via Bedrock batch inference (CreateModelInvocationJob).
+
+        Batch jobs cost roughly half of on-demand and run at higher
+        concurrency, but carry minutes of scheduling overhead — so small
+        observation sets (or deployments without the S3 bucket / IAM role
+        configured) fall back to the synchronous invoke_model path.
+        """
+        if threshold is None:
+            threshold = settings.bedrock_batch_threshold
+
+        if (
+            len(observations) < threshold
+            or not settings.s3_bucket
+            or not settings.bedrock_batch_role_arn
+        ):
+            return self.map_violations(observations)
+
+        job_prefix = f"bedrock-batch/osha-mapper/{uuid.uuid4()}"
+        input_key = f"{job_prefix}/input/observations.jsonl"
+        output_prefix = f"{job_prefix}/output/"
+
+        # One record per observation so records parallelize inside the job
+        lines = []
+        for i, obs in enumerate(observations):
+            record = {
+                "recordId": f"obs-{i:06d}",
+                "modelInput": {
+                    "system": [{"text": SYSTEM_PROMPT}],
+                    "messages": [{"role": "user", "content": [{"text": self._build_prompt([obs])}]}],
+                    "inferenceConfig": {"maxTokens": 1024, "temperature": 0.1},
+                },
+            }
+            lines.append(orjson.dumps(record).decode("utf-8"))
+
+        s3 = make_aws_client("s3")
+        s3.put_object(
+            Bucket=settings.s3_bucket,
+            Key=input_key,
+            Body="\n".join(lines).encode("utf-8"),
+        )
+
+        bedrock = make_aws_client("bedrock")
+        try:
+            job = bedrock.create_model_invocation_job(
+                jobName=f"osha-mapper-{uuid.uuid4().hex[:12]}",
+                modelId=self.model_id,
+                roleArn=settings.bedrock_batch_role_arn,
+                inputDataConfig={
+                    "s3InputDataConfig": {
+                        "s3Uri": f"s3://{settings.s3_bucket}/{input_key}"
+                    }
+                },
+                outputDataConfig={
+                    "s3OutputDataConfig": {
+                        "s3Uri": f"s3://{settings.s3_bucket}/{output_prefix}"
+                    }
+                },
+            )
+        except ClientError as e:
+            logger.error(f"Could not create batch inference job, falling back to sync: {e}")
+            return self.map_violations(observations)
+
+        job_arn = job["jobArn"]
+        logger.info(f"Batch inference job started for {len(observations)} observations: {job_arn}")
+
+        deadline = time.monotonic() + 3600
+        while time.monotonic() < deadline:
+            status = bedrock.get_model_invocation_job(jobIdentifier=job_arn)["status"]
+            if status == "Completed":
+                break
+            if status in ("Failed", "Stopped", "Expired"):
+                logger.error(f"Batch inference job {job_arn} ended with status {status}, falling back to sync")
+                return self.map_violations(observations)
+            time.sleep(30)
+        else:
+            logger.error(f"Batch inference job {job_arn} timed out, falling back to sync")
+            return self.map_violations(observations)
+
+        return self._collect_batch_output(s3, output_prefix, observations)
 
-        prompt = f"""{SYSTEM_PROMPT}
+    def _collect_batch_output(self, s3, output_prefix: str, observations: list[dict]) -> list[dict]:
+        """Read job output records from S3 and reassemble in observation order."""
+        by_record: dict[str, list] = {}
+        paginator = s3.get_paginator("list_objects_v2")
+        for page in paginator.paginate(Bucket=settings.s3_bucket, Prefix=output_prefix):
+            for item in page.get("Contents", []):
+                if not item["Key"].endswith(".jsonl.out"):
+                    continue
+                body = s3.get_object(Bucket=settings.s3_bucket, Key=item["Key"])["Body"].read()
+                for line in body.decode("utf-8").splitlines():
+                    if not line.strip():
+                        continue
+                    record = orjson.loads(line)
+                    output = record.get("modelOutput", {})
+                    try:
+                        text = output["output"]["message"]["content"][0]["text"]
+                    except (KeyError, IndexError):
+                        continue
+                    by_record[record.get("recordId", "")] = self._parse_json_array(text)
 
-Raw safety observations from a construction site inspection:
+        results = []
+        for i in range(len(observations)):
+            for item in by_record.get(f"obs-{i:06d}", []):
+                item["observation_index"] = i
+                item.setdefault("original_observation", observations[i].get("observation"))
+                item.setdefault("image_index", observations[i].get("image_index"))
+                results.append(item)
+        return results
+
+    @staticmethod
+    def _build_prompt(observations: list[dict]) -> str:
+        """User-turn prompt — SYSTEM_PROMPT travels separately as a cached system block."""
+        obs_text = json.dumps(observations, indent=2)
+
+        return f"""Raw safety observations from a construction site inspection:
 
 {obs_text}
 
@@ -91,33 +343,21 @@ For EACH observation, produce one JSON object. Return a JSON array:
 
 Return ONLY the JSON array. No other text."""
 
-        request_body = {
-            "messages": [{"role": "user", "content": [{"text": prompt}]}],
-            "inferenceConfig": {"maxTokens": 4096, "temperature": 0.1},
-        }
-
-        try:
-            response = self.client.invoke_model(
-                modelId=self.model_id,
-                body=json.dumps(request_body),
-                contentType="application/json",
-                accept="application/json",
-            )
-            response_body = json.loads(response["body"].read())
-            output_text = response_body["output"]["message"]["content"][0]["text"]
-            return self._parse_json_array(output_text)
-
-        except ClientError as e:
-            logger.error(f"Bedrock error in OSHA mapping: {e}")
-            raise
-
     @staticmethod
     def _parse_json_array(text: str) -> list:
         start = text.find("[")
-        end = text.rfind("]") + 1
-        if start >= 0 and end > start:
+        if start < 0:
+            return []
+        try:
+            # Model is told to return only the array, so parse straight
+            # through with orjson — no rfind scan for the closing bracket
+            return orjson.loads(text[start:].rstrip())
+        except orjson.JSONDecodeError:
             try:
-                return json.loads(text[start:end])
+                # raw_decode parses exactly one value and stops, tolerating
+                # any prose the model tacked on after the array
+                parsed, _ = _JSON_DECODER.raw_decode(text, start)
+                return parsed
             except json.JSONDecodeError as e:
                 logger.warning(f"JSON parse error in OSHA mapper: {e}")
         return []
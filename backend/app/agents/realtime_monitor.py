@@ -7,18 +7,28 @@ import asyncio
 import cv2
 import json
 import logging
+import os
+import sys
 import time
+
+import numpy as np
+from collections import OrderedDict
 from pathlib import Path
 from datetime import datetime
 from typing import Optional, Callable
 from dataclasses import dataclass, asdict
 
-from app.agents.image_analyzer import ImageAnalyzer
-from app.agents.osha_mapper import OSHAMapper
+from app.agents import get_image_analyzer, get_osha_mapper
+from app.agents._jpeg import encode_jpeg
 
 logger = logging.getLogger(__name__)
 
 
+def _write_file(path: str, data: bytes) -> None:
+    with open(path, "wb") as f:
+        f.write(data)
+
+
 @dataclass
 class ViolationAlert:
     """Real-time violation alert that gets broadcast via WebSocket"""
@@ -46,20 +56,39 @@ class ViolationDeduplicator:
     Prevents duplicate alerts for the same violation.
     Uses cooldown period: once detected, same violation type won't alert again for N seconds.
     """
+
+    # Cooldown entries are LRU-evicted past this point so memory stays
+    # bounded on long sessions with high hazard/location diversity
+    MAX_ENTRIES = 1024
+
     def __init__(self, cooldown_seconds: int = 300):  # 5 minute default
         self.cooldown_seconds = cooldown_seconds
-        self.last_seen = {}  # (hazard_type, location) -> timestamp
+        self.last_seen: OrderedDict = OrderedDict()  # (hazard_type, location) -> timestamp
+        # Raw string -> interned lowercase form. The same hazard types and
+        # locations recur for the whole session; interning means repeat
+        # checks reuse one string (precomputed hash, identity compare)
+        # instead of allocating a fresh .lower() copy per frame.
+        self._canon: dict = {}
+
+    def _canonical(self, raw: str) -> str:
+        cached = self._canon.get(raw)
+        if cached is None:
+            cached = self._canon.setdefault(raw, sys.intern(raw.lower()))
+        return cached
 
     def should_alert(self, hazard_type: str, location: str, current_timestamp: float) -> bool:
         """Check if this violation should trigger an alert"""
-        key = (hazard_type.lower(), location.lower())
+        key = (self._canonical(hazard_type), self._canonical(location))
         last_time = self.last_seen.get(key)
 
         if last_time is None:
             # First time seeing this violation
             self.last_seen[key] = current_timestamp
+            self._evict()
             return True
 
+        self.last_seen.move_to_end(key)
+
         time_since_last = current_timestamp - last_time
         if time_since_last >= self.cooldown_seconds:
             # Cooldown period has passed
@@ -69,6 +98,10 @@ class ViolationDeduplicator:
         # Still in cooldown period
         return False
 
+    def _evict(self):
+        while len(self.last_seen) > self.MAX_ENTRIES:
+            self.last_seen.popitem(last=False)
+
     def reset(self):
         """Clear all cooldown timers"""
         self.last_seen.clear()
@@ -80,11 +113,49 @@ class RealtimeMonitor:
     Simulates live CCTV monitoring for hackathon demo.
     """
 
+    # Bounded pipeline depth — how many analysis frames the decoder may
+    # run ahead of Bedrock (and alerts ahead of the clip writer)
+    PREFETCH = 4
+
+    # Micro-batching: up to this many decoded frames share one Bedrock
+    # request (Nova takes multiple image blocks), amortizing the network
+    # round-trip; a partial batch is flushed after the wait window
+    BATCH_SIZE = 4
+    BATCH_WINDOW = 1.0   # seconds
+
+    # Perceptual-hash cache: frames whose dHash lands within this Hamming
+    # distance of a recently analyzed frame reuse that frame's
+    # observations instead of paying for another Nova Pro call. Static
+    # CCTV scenes hit this constantly.
+    DHASH_MAX_ENTRIES = 128
+    DHASH_MAX_DISTANCE = 5
+
+    # Motion gate: frames whose downsampled grayscale absdiff against the
+    # previously analyzed frame stays under this mean skip Bedrock
+    # entirely. CCTV scenes are static for long stretches, and a
+    # stationary violation already alerted at first appearance (and sits
+    # inside the dedupe cooldown anyway).
+    MOTION_THRESH = 3.0
+
     def __init__(self):
-        self.image_analyzer = ImageAnalyzer()
-        self.osha_mapper = OSHAMapper()
+        # Let OpenCV thread its decode/encode internals, but cap it — past
+        # ~4 threads the per-stream decode gains flatten, and on a server
+        # running several sessions the cores are better spent across
+        # streams than inside one
+        cv2.setNumThreads(min(4, os.cpu_count() or 1))
+        # Shared per-process agents — keeps one Bedrock connection pool
+        # (and their response caches) warm across sessions
+        self.image_analyzer = get_image_analyzer()
+        self.osha_mapper = get_osha_mapper()
         self.is_running = False
         self.current_session_id = None
+        # Dedicated capture for clip extraction, reused across all clips in
+        # a session (separate from the monitor capture so seeks don't fight)
+        self._clip_cap: Optional[cv2.VideoCapture] = None
+        self._clip_video_path: Optional[str] = None
+        self._clip_props: Optional[tuple] = None
+        # Strided subsample of the last analyzed frame, for motion gating
+        self._prev_sample = None
 
     async def start_monitoring(
         self,
@@ -93,6 +164,7 @@ class RealtimeMonitor:
         analysis_interval: float = 1.5,
         on_violation: Optional[Callable] = None,
         on_progress: Optional[Callable] = None,
+        simulate_realtime: bool = False,
     ):
         """
         Start processing video frame-by-frame.
@@ -103,10 +175,17 @@ class RealtimeMonitor:
             analysis_interval: Seconds between frame analyses (default 1.5)
             on_violation: Async callback when violation detected: async fn(ViolationAlert)
             on_progress: Async callback for progress updates: async fn(current_time, total_time, frame)
+            simulate_realtime: Pace the reader to the video's own clock
+                (live-CCTV demo mode). Off by default so uploaded footage
+                processes as fast as decode + analysis allow.
         """
         self.is_running = True
         self.current_session_id = session_id
+        self._prev_sample = None
         deduplicator = ViolationDeduplicator(cooldown_seconds=300)
+        # Cap concurrent Bedrock round-trips so overlapped analyses stay
+        # inside AWS TPS limits
+        bedrock_sem = asyncio.Semaphore(4)
 
         # Open video
         cap = cv2.VideoCapture(video_path)
@@ -122,7 +201,6 @@ class RealtimeMonitor:
         # Calculate frame skip interval
         frames_per_analysis = int(fps * analysis_interval)
 
-        frame_number = 0
         analysis_count = 0
         violations_detected = 0
 
@@ -132,95 +210,328 @@ class RealtimeMonitor:
         clips_dir = output_dir / "clips"
         frames_dir.mkdir(parents=True, exist_ok=True)
         clips_dir.mkdir(parents=True, exist_ok=True)
+        # Plain-string prefix for per-frame path building — Path.__truediv__
+        # re-normalizes on every call, which is waste on the hot path
+        frames_dir_str = f"{frames_dir}{os.sep}"
+
+        # Three-stage pipeline: reader (decode+encode) → analyzer (Bedrock)
+        # → writer (evidence frames + clip extraction). Bounded queues give
+        # back-pressure for free — the decoder prefetches while Bedrock
+        # analyzes frame N, and clip extraction overlaps the next analysis
+        # instead of stalling the whole loop.
+        read_q: asyncio.Queue = asyncio.Queue(maxsize=self.PREFETCH)
+        write_q: asyncio.Queue = asyncio.Queue(maxsize=self.PREFETCH)
+
+        async def _reader():
+            frame_number = 0
+            first = True
+            wall_start = time.monotonic()
+            try:
+                while self.is_running:
+                    if simulate_realtime and not first:
+                        # Hold the reader to the video clock for demo mode
+                        video_time = frame_number / fps
+                        lag = video_time - (time.monotonic() - wall_start)
+                        if lag > 0:
+                            await asyncio.sleep(lag)
+                    skips = 0 if first else frames_per_analysis - 1
+                    if not first:
+                        frame_number += frames_per_analysis
+                    first = False
+                    kind, jpeg_bytes, frame_hash = await asyncio.to_thread(
+                        self._read_for_analysis, cap, skips
+                    )
+                    if kind == "eof":
+                        logger.info("End of video reached")
+                        break
+                    if kind == "error":
+                        logger.warning(f"Could not encode frame {frame_number}, skipping")
+                        continue
+                    if kind == "skip":
+                        logger.debug(f"Motion gate: frame {frame_number} unchanged, skipping Bedrock")
+                        await read_q.put((frame_number, frame_number / fps, None, None))
+                        continue
+                    await read_q.put((frame_number, frame_number / fps, jpeg_bytes, frame_hash))
+            finally:
+                await read_q.put(None)
+
+        async def _writer():
+            while True:
+                item = await write_q.get()
+                if item is None:
+                    return
+                try:
+                    await _write_violation(item)
+                except Exception as e:
+                    # Keep draining: if the writer died here, the analyzer
+                    # would eventually park forever on a full write_q and
+                    # the session would hang in "processing". Losing one
+                    # violation's evidence is the lesser failure.
+                    logger.error(f"Violation writer failed (violation dropped): {e}", exc_info=True)
+
+        async def _write_violation(item):
+            jpeg_bytes, frame_path, current_timestamp, frame_number, violation_no, obs, violation = item
+
+            async def _save_frame():
+                # Persist the frame as evidence now that we know it matters
+                if not os.path.exists(frame_path):
+                    await asyncio.to_thread(_write_file, frame_path, jpeg_bytes)
+
+            # Frame write and clip extraction touch different files —
+            # run them concurrently instead of serially
+            _, clip_path = await asyncio.gather(
+                _save_frame(),
+                self._extract_clip(
+                    video_path,
+                    current_timestamp,
+                    clips_dir / f"violation_{violation_no}.mp4",
+                    duration_before=15,
+                    duration_after=15,
+                ),
+            )
+
+            hazard_type = obs.get("hazard_type", "Unknown")
+            alert = ViolationAlert(
+                violation_id=f"{session_id}_{violation_no}",
+                session_id=session_id,
+                timestamp=current_timestamp,
+                frame_number=frame_number,
+                hazard_type=hazard_type,
+                severity=violation.get("severity", "MEDIUM"),
+                observation=obs.get("observation", ""),
+                location=obs.get("location", "Unknown location"),
+                osha_code=violation.get("osha_code"),
+                osha_title=violation.get("osha_title"),
+                plain_english=violation.get("plain_english"),
+                frame_path=frame_path,
+                video_clip_path=str(clip_path) if clip_path else None,
+                detected_at=datetime.utcnow().isoformat(),
+            )
+
+            logger.info(f"🚨 VIOLATION DETECTED: {hazard_type} at {current_timestamp:.1f}s - {violation.get('severity')}")
+
+            if on_violation:
+                await on_violation(alert)
+
+        reader_task = asyncio.create_task(_reader())
+        writer_task = asyncio.create_task(_writer())
 
         try:
-            while self.is_running and cap.isOpened():
-                ret, frame = cap.read()
-                if not ret:
-                    logger.info("End of video reached")
+            loop = asyncio.get_running_loop()
+            eof = False
+
+            # dHash → observations for the last DHASH_MAX_ENTRIES analyzed
+            # frames. A near-duplicate frame (Hamming < DHASH_MAX_DISTANCE)
+            # reuses the stored result — including the empty-list "nothing
+            # found" outcome — and never reaches Nova Pro.
+            dhash_cache: "OrderedDict[int, list[dict]]" = OrderedDict()
+            cache_hits = 0
+
+            def _dhash_lookup(frame_hash):
+                for key in reversed(dhash_cache):
+                    if (frame_hash ^ key).bit_count() < self.DHASH_MAX_DISTANCE:
+                        dhash_cache.move_to_end(key)
+                        return dhash_cache[key]
+                return None
+
+            def _dhash_store(frame_hash, observations):
+                dhash_cache[frame_hash] = observations
+                while len(dhash_cache) > self.DHASH_MAX_ENTRIES:
+                    dhash_cache.popitem(last=False)
+
+            async def _progress_only(marker):
+                # Motion-gated frame: counts as analyzed, no Bedrock call
+                nonlocal analysis_count
+                analysis_count += 1
+                if on_progress:
+                    await on_progress(marker[1], duration, marker[0])
+
+            async def _handle_observations(frame_number, current_timestamp, jpeg_bytes, observations):
+                nonlocal violations_detected
+                logger.info(f"Frame {frame_number} ({current_timestamp:.1f}s): {len(observations)} observations")
+                frame_path = f"{frames_dir_str}frame_{frame_number:06d}.jpg"
+
+                try:
+                    # Map to OSHA violations
+                    async with bedrock_sem:
+                        violations = await asyncio.to_thread(
+                            self.osha_mapper.map_violations, observations
+                        )
+
+                    for idx, violation in enumerate(violations):
+                        obs = observations[idx]
+                        hazard_type = obs.get("hazard_type", "Unknown")
+                        location = obs.get("location", "Unknown location")
+
+                        # Check deduplication
+                        if deduplicator.should_alert(hazard_type, location, current_timestamp):
+                            violations_detected += 1
+                            await write_q.put((
+                                jpeg_bytes, frame_path, current_timestamp,
+                                frame_number, violations_detected, obs, violation,
+                            ))
+                        else:
+                            logger.debug(f"Duplicate violation suppressed: {hazard_type} at {location}")
+
+                except Exception as e:
+                    logger.error(f"Error analyzing frame {frame_number}: {e}")
+
+            async def _try_cache(item) -> bool:
+                # Near-duplicate of a recently analyzed frame? Reuse its
+                # observations and skip the model call entirely.
+                nonlocal analysis_count, cache_hits
+                cached = _dhash_lookup(item[3])
+                if cached is None:
+                    return False
+                analysis_count += 1
+                cache_hits += 1
+                logger.debug(f"dHash cache hit for frame {item[0]} — reusing prior observations")
+                if on_progress:
+                    await on_progress(item[1], duration, item[0])
+                if cached:
+                    await _handle_observations(item[0], item[1], item[2], cached)
+                return True
+
+            while not eof:
+                item = await read_q.get()
+                if item is None:
                     break
-
-                current_timestamp = frame_number / fps
-
-                # Analyze frame at intervals
-                if frame_number % frames_per_analysis == 0:
-                    analysis_count += 1
-
-                    # Save frame for analysis
-                    frame_path = frames_dir / f"frame_{frame_number:06d}.jpg"
-                    cv2.imwrite(str(frame_path), frame)
-
-                    # Send progress update
-                    if on_progress:
-                        await on_progress(current_timestamp, duration, frame_number)
-
-                    # Analyze frame for violations
+                if item[2] is None:
+                    await _progress_only(item)
+                    continue
+                if await _try_cache(item):
+                    continue
+
+                # Collect a micro-batch: more frames if the reader has them,
+                # but never wait past the batch window
+                batch = [item]
+                deadline = loop.time() + self.BATCH_WINDOW
+                while len(batch) < self.BATCH_SIZE:
+                    remaining = deadline - loop.time()
+                    if remaining <= 0:
+                        break
                     try:
-                        observations = self.image_analyzer.analyze_image(str(frame_path))
-
-                        if observations:
-                            logger.info(f"Frame {frame_number} ({current_timestamp:.1f}s): {len(observations)} observations")
-
-                            # Map to OSHA violations
-                            violations = self.osha_mapper.map_violations(observations)
-
-                            for idx, violation in enumerate(violations):
-                                obs = observations[idx]
-                                hazard_type = obs.get("hazard_type", "Unknown")
-                                location = obs.get("location", "Unknown location")
-
-                                # Check deduplication
-                                if deduplicator.should_alert(hazard_type, location, current_timestamp):
-                                    violations_detected += 1
-
-                                    # Extract video clip around violation (15 seconds before/after)
-                                    clip_path = await self._extract_clip(
-                                        video_path,
-                                        current_timestamp,
-                                        clips_dir / f"violation_{violations_detected}.mp4",
-                                        duration_before=15,
-                                        duration_after=15
-                                    )
-
-                                    # Create alert
-                                    alert = ViolationAlert(
-                                        violation_id=f"{session_id}_{violations_detected}",
-                                        session_id=session_id,
-                                        timestamp=current_timestamp,
-                                        frame_number=frame_number,
-                                        hazard_type=hazard_type,
-                                        severity=violation.get("severity", "MEDIUM"),
-                                        observation=obs.get("observation", ""),
-                                        location=location,
-                                        osha_code=violation.get("osha_code"),
-                                        osha_title=violation.get("osha_title"),
-                                        plain_english=violation.get("plain_english"),
-                                        frame_path=str(frame_path),
-                                        video_clip_path=str(clip_path) if clip_path else None,
-                                        detected_at=datetime.utcnow().isoformat(),
-                                    )
-
-                                    logger.info(f"🚨 VIOLATION DETECTED: {hazard_type} at {current_timestamp:.1f}s - {violation.get('severity')}")
-
-                                    # Trigger callback
-                                    if on_violation:
-                                        await on_violation(alert)
-                                else:
-                                    logger.debug(f"Duplicate violation suppressed: {hazard_type} at {location}")
-
-                    except Exception as e:
-                        logger.error(f"Error analyzing frame {frame_number}: {e}")
-
-                frame_number += 1
-
-                # Small delay to simulate real-time processing
-                await asyncio.sleep(0.01)
+                        nxt = await asyncio.wait_for(read_q.get(), remaining)
+                    except asyncio.TimeoutError:
+                        break
+                    if nxt is None:
+                        eof = True
+                        break
+                    if nxt[2] is None:
+                        await _progress_only(nxt)
+                        continue
+                    if await _try_cache(nxt):
+                        continue
+                    batch.append(nxt)
+
+                analysis_count += len(batch)
+
+                # Send progress update for the newest frame in the batch
+                if on_progress:
+                    frame_number, current_timestamp, _, _ = batch[-1]
+                    await on_progress(current_timestamp, duration, frame_number)
+
+                # Analyze the batch in one Bedrock request — the round-trip
+                # runs in a thread so the event loop keeps servicing
+                # progress callbacks and other sessions meanwhile
+                try:
+                    async with bedrock_sem:
+                        per_frame = await asyncio.to_thread(
+                            self.image_analyzer.analyze_images_batch,
+                            [jpeg_bytes for _, _, jpeg_bytes, _ in batch],
+                        )
+                except Exception as e:
+                    logger.error(f"Error analyzing frames {[n for n, *_ in batch]}: {e}")
+                    continue
+
+                for (frame_number, current_timestamp, jpeg_bytes, frame_hash), observations in zip(batch, per_frame):
+                    _dhash_store(frame_hash, observations)
+                    if not observations:
+                        continue
+                    await _handle_observations(frame_number, current_timestamp, jpeg_bytes, observations)
+
+            await write_q.put(None)
+            await writer_task
+            if cache_hits:
+                logger.info(f"dHash cache saved {cache_hits} Nova Pro call(s) this session")
 
         finally:
-            cap.release()
             self.is_running = False
+            reader_task.cancel()
+            writer_task.cancel()
+            await asyncio.gather(reader_task, writer_task, return_exceptions=True)
+            cap.release()
+            if self._clip_cap is not None:
+                self._clip_cap.release()
+                self._clip_cap = None
+                self._clip_video_path = None
+                self._clip_props = None
             logger.info(f"Monitoring session {session_id} completed: {analysis_count} frames analyzed, {violations_detected} violations")
 
+    def _read_for_analysis(self, cap, skips: int) -> tuple[str, Optional[bytes], Optional[int]]:
+        """
+        Advance to the next analysis frame and return
+        ("frame", jpeg bytes, dHash).
+
+        grab() advances the demuxer without the YUV→BGR decode + copy of
+        read(), so the `skips` frames between analyses cost almost
+        nothing. Frames with no visible motion since the last analyzed
+        frame return ("skip", None, None) instead of going to Bedrock.
+        Other outcomes: ("eof", None, None) at end of video,
+        ("error", None, None) when the JPEG encode fails.
+        """
+        for _ in range(skips + 1):
+            if not cap.grab():
+                return "eof", None, None
+        ret, frame = cap.retrieve()
+        if not ret:
+            return "eof", None, None
+
+        # Cheap motion check on a strided subsample — no resize/cvtColor
+        # temporaries, just a view plus one small fused diff. The
+        # reference is the last *analyzed* frame, not the last candidate:
+        # updating it on skips would let a slow drift (each step under
+        # the threshold) keep the gate shut forever.
+        sample = self._motion_sample(frame)
+        prev_sample = self._prev_sample
+        if (
+            prev_sample is not None
+            and prev_sample.shape == sample.shape
+            and np.abs(sample - prev_sample).mean() < self.MOTION_THRESH
+        ):
+            return "skip", None, None
+
+        jpeg_bytes = encode_jpeg(frame, quality=85)
+        if jpeg_bytes is None:
+            return "error", None, None
+        self._prev_sample = sample
+        return "frame", jpeg_bytes, self._dhash(frame)
+
+    @staticmethod
+    def _dhash(frame) -> int:
+        """
+        64-bit difference hash of the green channel: shrink to 9x8, then
+        each bit records whether a pixel is brighter than its left
+        neighbor. Near-identical frames land within a few bits of each
+        other, which is what the analyzer's cache keys on.
+        """
+        small = cv2.resize(frame[:, :, 1], (9, 8), interpolation=cv2.INTER_AREA)
+        diff = small[:, 1:] > small[:, :-1]
+        return int.from_bytes(np.packbits(diff).tobytes(), "big")
+
+    @staticmethod
+    def _motion_sample(frame) -> np.ndarray:
+        """
+        Strided green-channel subsample of a BGR frame, roughly 64x36.
+
+        Slicing is a view — the only allocation is the small int16 copy
+        needed so the absdiff can go negative without wrapping.
+        """
+        height, width = frame.shape[:2]
+        step_y = max(1, height // 36)
+        step_x = max(1, width // 64)
+        return frame[::step_y, ::step_x, 1].astype(np.int16)
+
     async def _extract_clip(
         self,
         video_path: str,
@@ -242,14 +553,54 @@ class RealtimeMonitor:
         Returns:
             Path to extracted clip or None if failed
         """
+        start_time = max(0, timestamp - duration_before)
+        duration = duration_before + duration_after
+
+        # ffmpeg stream copy remuxes without decoding or re-encoding a
+        # single frame — a 30s clip costs milliseconds instead of 900
+        # decode+encode round-trips. Cut points snap to the nearest prior
+        # keyframe, which is fine for evidence clips.
+        try:
+            proc = await asyncio.create_subprocess_exec(
+                "ffmpeg", "-y",
+                "-ss", str(start_time),
+                "-i", video_path,
+                "-t", str(duration),
+                "-c", "copy",
+                "-avoid_negative_ts", "make_zero",
+                str(output_path),
+                stdout=asyncio.subprocess.DEVNULL,
+                stderr=asyncio.subprocess.DEVNULL,
+            )
+            returncode = await proc.wait()
+            if returncode == 0 and output_path.exists() and output_path.stat().st_size > 0:
+                logger.info(f"Extracted clip (stream copy): {output_path}")
+                return output_path
+            logger.warning(f"ffmpeg stream copy failed (rc={returncode}), falling back to OpenCV")
+        except FileNotFoundError:
+            logger.debug("ffmpeg not available, using OpenCV clip extraction")
+
+        # OpenCV decode/encode is blocking — keep it off the event loop
+        return await asyncio.to_thread(
+            self._extract_clip_sync, video_path, timestamp, output_path,
+            duration_before, duration_after,
+        )
+
+    def _extract_clip_sync(
+        self,
+        video_path: str,
+        timestamp: float,
+        output_path: Path,
+        duration_before: float,
+        duration_after: float,
+    ) -> Optional[Path]:
         try:
             start_time = max(0, timestamp - duration_before)
             duration = duration_before + duration_after
 
-            cap = cv2.VideoCapture(video_path)
-            fps = cap.get(cv2.CAP_PROP_FPS)
-            width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
-            height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+            # Reuse one capture (and its probed fps/size) for every clip in
+            # the session — re-opening per clip repeats container probing
+            cap, (fps, width, height) = self._ensure_clip_cap(video_path)
 
             # Jump to start time
             start_frame = int(start_time * fps)
@@ -266,7 +617,6 @@ class RealtimeMonitor:
                     break
                 out.write(frame)
 
-            cap.release()
             out.release()
 
             logger.info(f"Extracted clip: {output_path}")
@@ -276,6 +626,20 @@ class RealtimeMonitor:
             logger.error(f"Error extracting clip: {e}")
             return None
 
+    def _ensure_clip_cap(self, video_path: str):
+        """Open (or reuse) the session's clip-extraction capture."""
+        if self._clip_cap is None or self._clip_video_path != video_path:
+            if self._clip_cap is not None:
+                self._clip_cap.release()
+            self._clip_cap = cv2.VideoCapture(video_path)
+            self._clip_video_path = video_path
+            self._clip_props = (
+                self._clip_cap.get(cv2.CAP_PROP_FPS),
+                int(self._clip_cap.get(cv2.CAP_PROP_FRAME_WIDTH)),
+                int(self._clip_cap.get(cv2.CAP_PROP_FRAME_HEIGHT)),
+            )
+        return self._clip_cap, self._clip_props
+
     def pause(self):
         """Pause monitoring"""
         self.is_running = False
@@ -3,29 +3,36 @@ Agent 3 — Report Generator (Amazon Nova Lite)
 Synthesizes all violations into a professional inspection report with
 an executive summary, prioritized action list, and compliance risk score.
 """
+import hashlib
 import json
 import logging
+from collections import OrderedDict
 from datetime import datetime
 
-import boto3
+import numpy as np
+import orjson
 from botocore.exceptions import ClientError
 
+from app.agents._bedrock import get_bedrock_runtime
 from app.config import settings
 
 logger = logging.getLogger(__name__)
 
 SEVERITY_ORDER = {"CRITICAL": 0, "HIGH": 1, "MEDIUM": 2, "LOW": 3}
+_SEVERITY_BY_RANK = {rank: name for name, rank in SEVERITY_ORDER.items()}
+
+# Below this many violations, plain Python sorting beats NumPy's setup cost
+_NUMPY_MIN_VIOLATIONS = 64
+
+CACHE_MAX_ENTRIES = 512
 
 
 class ReportGenerator:
     def __init__(self):
-        self.client = boto3.client(
-            "bedrock-runtime",
-            region_name=settings.aws_region,
-            aws_access_key_id=settings.aws_access_key_id or None,
-            aws_secret_access_key=settings.aws_secret_access_key or None,
-        )
+        self.client = get_bedrock_runtime()
         self.model_id = settings.nova_lite_model_id
+        # Identical requests (retries, demo re-runs) skip Bedrock entirely
+        self._cache: "OrderedDict[str, dict]" = OrderedDict()
 
     def generate_report(
         self,
@@ -40,17 +47,10 @@ class ReportGenerator:
             return self._empty_report(site_name, inspector_name, inspection_date)
 
         # Sort by severity for the prompt
-        sorted_violations = sorted(
-            violations, key=lambda v: SEVERITY_ORDER.get(v.get("severity", "LOW"), 3)
-        )
+        sorted_violations, counts = self._rank_and_count(violations)
 
         violations_text = json.dumps(sorted_violations, indent=2)
 
-        counts = {"CRITICAL": 0, "HIGH": 0, "MEDIUM": 0, "LOW": 0}
-        for v in violations:
-            sev = v.get("severity", "LOW")
-            counts[sev] = counts.get(sev, 0) + 1
-
         prompt = f"""You are a senior safety compliance officer writing an official OSHA inspection report.
 
 Site: {site_name}
@@ -92,33 +92,121 @@ Return ONLY the JSON object. No other text."""
             "messages": [{"role": "user", "content": [{"text": prompt}]}],
             "inferenceConfig": {"maxTokens": 3000, "temperature": 0.2},
         }
+        body_json = orjson.dumps(request_body)
+
+        cache_key = None
+        if settings.enable_bedrock_cache:
+            cache_key = hashlib.blake2b(body_json).hexdigest()
+            cached = self._cache.get(cache_key)
+            if cached is not None:
+                self._cache.move_to_end(cache_key)
+                logger.info(f"Report cache hit for {site_name}")
+                return dict(cached)
 
         try:
             response = self.client.invoke_model(
                 modelId=self.model_id,
-                body=json.dumps(request_body),
+                body=body_json,
                 contentType="application/json",
                 accept="application/json",
             )
-            response_body = json.loads(response["body"].read())
+            response_body = orjson.loads(response["body"].read())
             output_text = response_body["output"]["message"]["content"][0]["text"]
-            return self._parse_json_object(output_text)
+            report = self._parse_json_object(output_text)
+            if cache_key is not None and report:
+                self._cache[cache_key] = dict(report)
+                while len(self._cache) > CACHE_MAX_ENTRIES:
+                    self._cache.popitem(last=False)
+            return report
 
         except ClientError as e:
             logger.error(f"Bedrock error generating report: {e}")
             raise
 
+    @staticmethod
+    def _rank_and_count(violations: list[dict]) -> tuple[list[dict], dict]:
+        """
+        Sort violations by severity and tally per-level counts.
+
+        Large monitoring sessions can hand over thousands of violations;
+        mapping severities to int8 ranks and using argsort/unique keeps
+        that out of the Python interpreter. Small lists take the plain
+        path, where NumPy's setup cost would dominate.
+        """
+        if len(violations) < _NUMPY_MIN_VIOLATIONS:
+            sorted_violations = sorted(
+                violations, key=lambda v: SEVERITY_ORDER.get(v.get("severity", "LOW"), 3)
+            )
+            counts = {"CRITICAL": 0, "HIGH": 0, "MEDIUM": 0, "LOW": 0}
+            for v in violations:
+                sev = v.get("severity", "LOW")
+                counts[sev] = counts.get(sev, 0) + 1
+            return sorted_violations, counts
+
+        ranks = np.fromiter(
+            (SEVERITY_ORDER.get(v.get("severity", "LOW"), 3) for v in violations),
+            dtype=np.int8,
+            count=len(violations),
+        )
+        order = np.argsort(ranks, kind="stable")
+        sorted_violations = [violations[i] for i in order]
+
+        counts = {"CRITICAL": 0, "HIGH": 0, "MEDIUM": 0, "LOW": 0}
+        uniq, tallies = np.unique(ranks, return_counts=True)
+        for rank, tally in zip(uniq.tolist(), tallies.tolist()):
+            counts[_SEVERITY_BY_RANK[rank]] += tally
+        return sorted_violations, counts
+
     @staticmethod
     def _parse_json_object(text: str) -> dict:
         start = text.find("{")
-        end = text.rfind("}") + 1
-        if start >= 0 and end > start:
+        if start < 0:
+            return {}
+        # Walk forward to the matching close brace instead of trusting
+        # rfind — Nova occasionally appends prose after the object
+        end = ReportGenerator._match_brace(text, start)
+        if end < 0:
+            end = text.rfind("}") + 1
+            if end <= start:
+                return {}
+        try:
+            return orjson.loads(text[start:end])
+        except orjson.JSONDecodeError:
+            # orjson is strict — retry with stdlib json, which tolerates
+            # some of the model's occasionally sloppy output
             try:
                 return json.loads(text[start:end])
             except json.JSONDecodeError as e:
                 logger.warning(f"JSON parse error in report generator: {e}")
         return {}
 
+    @staticmethod
+    def _match_brace(text: str, start: int) -> int:
+        """Index just past the brace matching text[start], honoring string
+        literals; -1 if the object never closes."""
+        depth = 0
+        in_string = False
+        escaped = False
+        for i in range(start, len(text)):
+            ch = text[i]
+            if in_string:
+                if escaped:
+                    escaped = False
+                elif ch == "\\":
+                    escaped = True
+                elif ch == '"':
+                    in_string = False
+                continue
+            if ch == '"':
+                in_string = True
+            elif ch == "{":
+                depth += 1
+            elif ch == "}":
+                depth -= 1
+                if depth == 0:
+                    return i + 1
+        return -1
+
     @staticmethod
     def _empty_report(site_name: str, inspector_name: str, inspection_date: str) -> dict:
         return {
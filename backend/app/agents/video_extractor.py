@@ -5,31 +5,60 @@ These frames are then fed into the ImageAnalyzer just like regular photos.
 
 Strategy: extract 1 frame every N seconds (default: every 5s), capped at
 MAX_FRAMES to keep Bedrock costs reasonable for a demo.
+
+Decoding backend: decord when installed — its keyframe-aware seeking
+decodes only from the nearest I-frame to each sample point, so sparse
+sampling skips most of the decode work. OpenCV's sequential-grab loop is
+the fallback (and handles VFR inputs decord chokes on).
 """
 import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
+from app.config import settings
+
 logger = logging.getLogger(__name__)
 
 FRAME_INTERVAL_SECONDS = 5   # grab one frame every 5 seconds
 MAX_FRAMES = 10               # safety cap — max frames per video
 
 
-def extract_frames(video_path: str, output_dir: str) -> list[str]:
-    """
-    Extract keyframes from a video and save as JPEGs.
-    Returns list of saved frame paths.
-    """
+def _sample_frames_decord(video_path: str):
+    """Yield (timestamp_seconds, BGR frame) via decord's batched decode."""
+    import numpy as np
+    from decord import VideoReader, cpu
+
+    vr = VideoReader(video_path, ctx=cpu(0), num_threads=os.cpu_count() or 1)
+    fps = vr.get_avg_fps() or 30
+    interval_frames = max(1, int(fps * FRAME_INTERVAL_SECONDS))
+    indices = list(range(0, len(vr), interval_frames))[:MAX_FRAMES]
+    if not indices:
+        return
+
+    logger.info(
+        f"Video: {Path(video_path).name} — "
+        f"{len(vr) / fps:.1f}s, {fps:.0f}fps, decord batch of {len(indices)} frames"
+    )
+
+    batch = vr.get_batch(indices).asnumpy()  # (N, H, W, 3) RGB
+    for idx, frame in zip(indices, batch):
+        # decord hands back RGB; downstream (cv2/turbojpeg) expects BGR
+        yield idx / fps, np.ascontiguousarray(frame[:, :, ::-1])
+
+
+def _sample_frames_cv2(video_path: str):
+    """Yield (timestamp_seconds, BGR frame) via OpenCV sequential grabs."""
     try:
         import cv2
     except ImportError:
         logger.error("opencv-python-headless not installed. Run: pip install opencv-python-headless")
-        return []
+        return
 
     cap = cv2.VideoCapture(video_path)
     if not cap.isOpened():
         logger.error(f"Could not open video: {video_path}")
-        return []
+        return
 
     fps = cap.get(cv2.CAP_PROP_FPS) or 30
     total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
@@ -39,32 +68,103 @@ def extract_frames(video_path: str, output_dir: str) -> list[str]:
     if interval_frames < 1:
         interval_frames = 1
 
+    logger.info(
+        f"Video: {Path(video_path).name} — "
+        f"{duration_seconds:.1f}s, {fps:.0f}fps, extracting every {FRAME_INTERVAL_SECONDS}s"
+    )
+
+    frame_idx = 0
+    cur_frame = 0
+    yielded = 0
+    ended = False
+
+    try:
+        while cap.isOpened() and yielded < MAX_FRAMES and not ended:
+            # Sequential grab() to the target beats CAP_PROP_POS_FRAMES seeks:
+            # on H.264 every set() snaps to a keyframe and re-decodes forward,
+            # while grab() just advances the demuxer deterministically
+            while cur_frame < frame_idx:
+                if not cap.grab():
+                    ended = True
+                    break
+                cur_frame += 1
+            if ended:
+                break
+            if not cap.grab():
+                break
+            cur_frame += 1
+            ret, frame = cap.retrieve()
+            if not ret:
+                break
+
+            yield frame_idx / fps, frame
+            yielded += 1
+            frame_idx += interval_frames
+    finally:
+        cap.release()
+
+
+def extract_frames(video_path: str, output_dir: str) -> list[str]:
+    """
+    Extract keyframes from a video and save as JPEGs.
+    Returns list of saved frame paths.
+    """
+    from app.agents._jpeg import encode_jpeg
+
     output_path = Path(output_dir)
     output_path.mkdir(parents=True, exist_ok=True)
 
+    samples = None
+    try:
+        import decord  # noqa: F401
+        samples = list(_sample_frames_decord(video_path))
+    except ImportError:
+        pass
+    except Exception as e:
+        # VFR or otherwise unseekable input — cv2 handles these fine
+        logger.warning(f"decord failed on {Path(video_path).name} ({e}), falling back to cv2")
+    if samples is None:
+        samples = _sample_frames_cv2(video_path)
+
     saved_paths = []
-    frame_idx = 0
     saved_count = 0
 
-    logger.info(
-        f"Video: {Path(video_path).name} — "
-        f"{duration_seconds:.1f}s, {fps:.0f}fps, extracting every {FRAME_INTERVAL_SECONDS}s"
-    )
-
-    while cap.isOpened() and saved_count < MAX_FRAMES:
-        cap.set(cv2.CAP_PROP_POS_FRAMES, frame_idx)
-        ret, frame = cap.read()
-        if not ret:
-            break
+    # Mirror frames to S3 in the background while the next frame decodes,
+    # instead of serializing decode → write → upload
+    upload_pool = None
+    upload_futures = []
+    s3 = None
+    if settings.use_s3 and settings.s3_bucket:
+        import boto3
+        s3 = boto3.client("s3", region_name=settings.aws_region)
+        upload_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="frame-upload")
 
+    for timestamp, frame in samples:
+        jpeg_bytes = encode_jpeg(frame, quality=85)
+        if jpeg_bytes is None:
+            logger.warning(f"Could not encode frame at {timestamp:.1f}s, skipping")
+            continue
         frame_file = output_path / f"frame_{saved_count:04d}.jpg"
-        cv2.imwrite(str(frame_file), frame, [cv2.IMWRITE_JPEG_QUALITY, 85])
+        frame_file.write_bytes(jpeg_bytes)
         saved_paths.append(str(frame_file))
-        logger.info(f"  Extracted frame {saved_count + 1} at {frame_idx / fps:.1f}s → {frame_file.name}")
-
-        frame_idx += interval_frames
+        if upload_pool is not None:
+            key = f"extracted-frames/{output_path.name}/{frame_file.name}"
+            upload_futures.append(
+                upload_pool.submit(
+                    s3.put_object, Bucket=settings.s3_bucket, Key=key, Body=jpeg_bytes
+                )
+            )
+        logger.info(f"  Extracted frame {saved_count + 1} at {timestamp:.1f}s → {frame_file.name}")
         saved_count += 1
 
-    cap.release()
+    if upload_pool is not None:
+        for future in upload_futures:
+            try:
+                future.result()
+            except Exception as e:
+                logger.warning(f"S3 frame upload failed: {e}")
+        upload_pool.shutdown()
+        logger.info(f"Mirrored {len(upload_futures)} frames to s3://{settings.s3_bucket}")
+
     logger.info(f"Extracted {len(saved_paths)} frames from {Path(video_path).name}")
     return saved_paths
@@ -3,16 +3,26 @@ Agent 4 — Voice Assistant (Amazon Nova Lite)
 Real-time hands-free safety guidance for on-site inspectors.
 Inspector speaks a description; agent classifies it and gives immediate guidance.
 """
-import json
+import hashlib
 import logging
+import re
+from collections import OrderedDict
 
-import boto3
+import orjson
 from botocore.exceptions import ClientError
 
+from app.agents._bedrock import get_bedrock_runtime
 from app.config import settings
 
 logger = logging.getLogger(__name__)
 
+# Compiled once — these run on every voice exchange
+_OSHA_RE = re.compile(r"(29\s*CFR\s*)?(1926|1910)\.\d+", re.IGNORECASE)
+_SEVERITY_RE = re.compile(r"\b(CRITICAL|HIGH|MEDIUM|LOW)\b", re.IGNORECASE)
+_SEVERITY_RANK = {"CRITICAL": 0, "HIGH": 1, "MEDIUM": 2, "LOW": 3}
+
+CACHE_MAX_ENTRIES = 512
+
 VOICE_SYSTEM_PROMPT = """You are SafetyAI, a real-time voice assistant for construction site inspectors.
 An inspector is walking the site hands-free and describing what they see.
 
@@ -33,19 +43,56 @@ You respond: "Fall protection violation — OSHA 1926.502. Worker must stop work
 
 class VoiceAgent:
     def __init__(self):
-        self.client = boto3.client(
-            "bedrock-runtime",
-            region_name=settings.aws_region,
-            aws_access_key_id=settings.aws_access_key_id or None,
-            aws_secret_access_key=settings.aws_secret_access_key or None,
-        )
+        self.client = get_bedrock_runtime()
         self.model_id = settings.nova_lite_model_id
+        # Inspectors repeat stock phrases; identical (text + history)
+        # requests answer from here instead of a 1-2s Bedrock round-trip
+        self._cache: "OrderedDict[str, dict]" = OrderedDict()
 
     def process_observation(self, inspector_text: str, conversation_history: list[dict] = None) -> dict:
         """
         Process a voice observation from the inspector.
         Returns spoken response + structured violation data.
         """
+        body_json = self._build_body(inspector_text, conversation_history)
+
+        cache_key = self._cache_key(body_json)
+        if cache_key is not None:
+            cached = self._cache.get(cache_key)
+            if cached is not None:
+                self._cache.move_to_end(cache_key)
+                logger.info("Voice response cache hit")
+                return dict(cached)
+
+        spoken_response = "".join(self._stream_chunks(body_json))
+        return self._finalize(spoken_response, inspector_text, cache_key)
+
+    def stream_observation(self, inspector_text: str, conversation_history: list[dict] = None):
+        """
+        Generator variant of process_observation: yields response text
+        chunks as Bedrock produces them, so a TTS layer can start
+        speaking at first-token latency instead of waiting for the full
+        response. Severity/OSHA extraction (and caching) happen once the
+        stream completes.
+        """
+        body_json = self._build_body(inspector_text, conversation_history)
+
+        cache_key = self._cache_key(body_json)
+        if cache_key is not None:
+            cached = self._cache.get(cache_key)
+            if cached is not None:
+                self._cache.move_to_end(cache_key)
+                logger.info("Voice response cache hit")
+                yield cached["spoken_response"]
+                return
+
+        parts = []
+        for text in self._stream_chunks(body_json):
+            parts.append(text)
+            yield text
+        self._finalize("".join(parts), inspector_text, cache_key)
+
+    def _build_body(self, inspector_text: str, conversation_history: list[dict] = None) -> bytes:
         messages = []
 
         # Include conversation history for context
@@ -57,49 +104,69 @@ class VoiceAgent:
             "content": [{"text": f"{VOICE_SYSTEM_PROMPT}\n\nInspector says: {inspector_text}"}],
         })
 
-        request_body = {
+        return orjson.dumps({
             "messages": messages,
             "inferenceConfig": {"maxTokens": 512, "temperature": 0.1},
-        }
+        })
+
+    @staticmethod
+    def _cache_key(body_json: bytes) -> "str | None":
+        if not settings.enable_bedrock_cache:
+            return None
+        return hashlib.blake2b(body_json).hexdigest()
 
+    def _stream_chunks(self, body_json: bytes):
+        """Yield response text fragments as they arrive from Bedrock."""
         try:
-            response = self.client.invoke_model(
+            response = self.client.invoke_model_with_response_stream(
                 modelId=self.model_id,
-                body=json.dumps(request_body),
+                body=body_json,
                 contentType="application/json",
                 accept="application/json",
             )
-            response_body = json.loads(response["body"].read())
-            spoken_response = response_body["output"]["message"]["content"][0]["text"]
-
-            # Parse severity from response
-            severity = self._extract_severity(spoken_response)
-            osha_code = self._extract_osha_code(spoken_response)
-
-            return {
-                "spoken_response": spoken_response,
-                "severity": severity,
-                "osha_code": osha_code,
-                "original_text": inspector_text,
-                "is_violation": severity is not None,
-            }
-
+            for event in response["body"]:
+                chunk = orjson.loads(event["chunk"]["bytes"])
+                delta = chunk.get("contentBlockDelta")
+                if delta:
+                    text = delta.get("delta", {}).get("text", "")
+                    if text:
+                        yield text
         except ClientError as e:
             logger.error(f"Bedrock voice error: {e}")
             raise
 
+    def _finalize(self, spoken_response: str, inspector_text: str, cache_key: "str | None") -> dict:
+        # Parse severity from response
+        severity = self._extract_severity(spoken_response)
+        osha_code = self._extract_osha_code(spoken_response)
+
+        result = {
+            "spoken_response": spoken_response,
+            "severity": severity,
+            "osha_code": osha_code,
+            "original_text": inspector_text,
+            "is_violation": severity is not None,
+        }
+        if cache_key is not None:
+            self._cache[cache_key] = dict(result)
+            while len(self._cache) > CACHE_MAX_ENTRIES:
+                self._cache.popitem(last=False)
+        return result
+
     @staticmethod
     def _extract_severity(text: str) -> str | None:
-        text_upper = text.upper()
-        for sev in ["CRITICAL", "HIGH", "MEDIUM", "LOW"]:
-            if sev in text_upper:
-                return sev
+        # One case-insensitive scan — no full .upper() copy of the response,
+        # and word boundaries avoid false hits inside words like "highway".
+        # Take the highest-priority mention, not the leftmost: "this is
+        # not LOW risk, it is CRITICAL" must extract CRITICAL.
+        found = _SEVERITY_RE.findall(text)
+        if found:
+            return min((f.upper() for f in found), key=_SEVERITY_RANK.__getitem__)
         return None
 
     @staticmethod
     def _extract_osha_code(text: str) -> str | None:
-        import re
-        match = re.search(r"(29\s*CFR\s*)?(1926|1910)\.\d+", text, re.IGNORECASE)
+        match = _OSHA_RE.search(text)
         if match:
             return match.group(0).strip()
         return None
@@ -0,0 +1,47 @@
+"""
+Shared upload persistence helper.
+
+One asyncio.to_thread hop around synchronous stdlib I/O beats aiofiles
+here: aiofiles crosses the thread boundary on every read/write, while a
+pure-throughput copy only needs to leave the event loop once.
+"""
+import os
+import shutil
+
+_CHUNK = 1 << 20  # 1 MiB
+
+
+def save_upload(src_file, dest_path) -> None:
+    """Copy an UploadFile's underlying file object to dest_path.
+
+    Large uploads spill to a real temp file, so when the source has a
+    file descriptor the copy goes kernel-to-kernel via os.sendfile and
+    the bytes never cross into Python. Small (still in-memory spooled)
+    uploads fall back to a buffered chunked copy.
+
+    Runs blocking — call via asyncio.to_thread from route handlers.
+    """
+    with open(dest_path, "wb", buffering=_CHUNK) as f:
+        try:
+            src_fd = src_file.fileno()
+        except (AttributeError, OSError, ValueError):
+            src_fd = None
+
+        if src_fd is not None and hasattr(os, "sendfile"):
+            offset = 0
+            try:
+                size = os.fstat(src_fd).st_size
+                while offset < size:
+                    sent = os.sendfile(f.fileno(), src_fd, offset, size - offset)
+                    if sent == 0:
+                        break
+                    offset += sent
+                return
+            except OSError:
+                # A partial kernel copy already wrote bytes at the fd
+                # level — restarting buffered would corrupt the file
+                if offset:
+                    raise
+
+        src_file.seek(0)
+        shutil.copyfileobj(src_file, f, _CHUNK)
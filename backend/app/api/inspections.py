@@ -2,30 +2,67 @@
 REST API — Inspections
 Handles upload, analysis pipeline, and report retrieval.
 """
+import hashlib
+import multiprocessing
 import os
 import uuid
 import logging
 import asyncio
+from collections import Counter
 from datetime import datetime
 from pathlib import Path
 from typing import Optional
 
-import aiofiles
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form, BackgroundTasks
-from pydantic import BaseModel
-from sqlalchemy.orm import Session
+import orjson
+from concurrent.futures import ProcessPoolExecutor
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel, TypeAdapter
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, joinedload, selectinload
 
 from app.config import settings
-from app.database import get_db
+from app.database import get_db, get_async_db
 from app import models
-from app.agents import ImageAnalyzer, OSHAMapper, ReportGenerator
+from app.agents import get_image_analyzer, get_osha_mapper, get_report_generator
+from app.api._uploads import save_upload
 
 logger = logging.getLogger(__name__)
-router = APIRouter(prefix="/api/inspections", tags=["inspections"])
+# ORJSONResponse serializes response bodies in C — matters for detail
+# views carrying hundreds of violations
+router = APIRouter(
+    prefix="/api/inspections", tags=["inspections"], default_response_class=ORJSONResponse
+)
 
 ALLOWED_IMAGE_TYPES = {"image/jpeg", "image/png", "image/webp", "image/gif"}
 ALLOWED_VIDEO_TYPES = {"video/mp4", "video/quicktime", "video/x-msvideo"}
 
+# The analysis pipeline decodes video and images (cv2/PIL hold the GIL in
+# C loops) — running it in worker processes keeps Uvicorn's threads free
+# for requests. Workers build their own DB sessions and boto3 clients.
+_pipeline_pool: Optional[ProcessPoolExecutor] = None
+
+
+def _get_pipeline_pool() -> ProcessPoolExecutor:
+    global _pipeline_pool
+    if _pipeline_pool is None:
+        # spawn, not fork: forked children inherit the live SQLAlchemy
+        # connection pool (shared SQLite fds risk corruption) and forking
+        # a threaded asyncio server is unsafe in general. Workers import
+        # the app fresh and build their own engine and boto3 clients.
+        _pipeline_pool = ProcessPoolExecutor(
+            max_workers=2, mp_context=multiprocessing.get_context("spawn")
+        )
+    return _pipeline_pool
+
+
+def _log_pipeline_result(future) -> None:
+    """Surface worker crashes — a bare submit swallows them."""
+    exc = future.exception()
+    if exc is not None:
+        logger.error(f"Analysis pipeline worker failed: {exc}")
+
 
 # ─── Schemas ─────────────────────────────────────────────────────────────────
 
@@ -73,6 +110,11 @@ class InspectionDetailOut(InspectionOut):
     report: Optional[dict] = None
 
 
+# One C-level validation pass over the whole violations list, instead of
+# a Python loop of per-row model_validate calls
+_VIOLATIONS_ADAPTER = TypeAdapter(list[ViolationOut])
+
+
 class UpdateViolationRequest(BaseModel):
     status: Optional[str] = None
     assigned_to: Optional[str] = None
@@ -80,6 +122,10 @@ class UpdateViolationRequest(BaseModel):
     ticket_url: Optional[str] = None
 
 
+class BulkViolationUpdate(UpdateViolationRequest):
+    id: str
+
+
 # ─── Routes ──────────────────────────────────────────────────────────────────
 
 @router.post("", response_model=InspectionOut, status_code=201)
@@ -88,7 +134,6 @@ async def create_inspection(
     inspector_name: str = Form(""),
     location: str = Form(""),
     files: list[UploadFile] = File(...),
-    background_tasks: BackgroundTasks = BackgroundTasks(),
     db: Session = Depends(get_db),
 ):
     """Upload media and kick off the analysis pipeline in the background."""
@@ -97,7 +142,7 @@ async def create_inspection(
 
     # Create inspection record
     inspection = models.Inspection(
-        id=str(uuid.uuid4()),
+        id=models.new_id(),
         site_name=site_name,
         inspector_name=inspector_name or None,
         location=location or None,
@@ -121,9 +166,10 @@ async def create_inspection(
         ext = Path(file.filename).suffix if file.filename else ".jpg"
         dest = upload_path / f"{uuid.uuid4()}{ext}"
 
-        async with aiofiles.open(dest, "wb") as f:
-            content = await file.read()
-            await f.write(content)
+        # One thread hop for the whole copy — still chunked (so a GB video
+        # never sits fully in memory), without aiofiles' per-chunk
+        # executor round-trips
+        await asyncio.to_thread(save_upload, file.file, dest)
 
         is_image = file.content_type in ALLOWED_IMAGE_TYPES
         media = models.InspectionMedia(
@@ -142,47 +188,121 @@ async def create_inspection(
 
     db.commit()
 
-    # Kick off async analysis — pass both images and videos
-    background_tasks.add_task(
+    # Kick off analysis in a worker process — pass both images and videos
+    future = _get_pipeline_pool().submit(
         _run_analysis_pipeline, inspection.id, saved_images, saved_videos
     )
+    future.add_done_callback(_log_pipeline_result)
 
     db.refresh(inspection)
     return inspection
 
 
 @router.get("", response_model=list[InspectionOut])
-def list_inspections(skip: int = 0, limit: int = 50, db: Session = Depends(get_db)):
-    return (
-        db.query(models.Inspection)
+async def list_inspections(skip: int = 0, limit: int = 50, db: AsyncSession = Depends(get_async_db)):
+    result = await db.execute(
+        select(models.Inspection)
         .order_by(models.Inspection.created_at.desc())
         .offset(skip)
         .limit(limit)
-        .all()
     )
+    return result.scalars().all()
+
+
+_SEVERITY_ORDER = ["CRITICAL", "HIGH", "MEDIUM", "LOW"]
 
 
 @router.get("/{inspection_id}", response_model=InspectionDetailOut)
-def get_inspection(inspection_id: str, db: Session = Depends(get_db)):
-    inspection = db.query(models.Inspection).filter(models.Inspection.id == inspection_id).first()
+async def get_inspection(
+    inspection_id: str,
+    severity_gte: Optional[str] = None,
+    status: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    Inspection detail. `severity_gte` / `status` filter the violations
+    server-side (the ticket filer asks for open CRITICAL/HIGH rows only)
+    so uninteresting rows never get serialized or shipped.
+    """
+    filtered = severity_gte is not None or status is not None
+
+    # Eager-load up front: selectinload batches the violations into one
+    # query and joinedload folds the 1:1 report into the main SELECT,
+    # instead of lazy-loading each relationship on attribute access
+    # (mandatory on the async session, where implicit lazy-loads raise)
+    stmt = (
+        select(models.Inspection)
+        .options(joinedload(models.Inspection.report))
+        .where(models.Inspection.id == inspection_id)
+    )
+    if not filtered:
+        stmt = stmt.options(selectinload(models.Inspection.violations))
+    result = await db.execute(stmt)
+    inspection = result.scalars().first()
     if not inspection:
         raise HTTPException(status_code=404, detail="Inspection not found")
 
+    if filtered:
+        vq = select(models.Violation).where(models.Violation.inspection_id == inspection_id)
+        if status is not None:
+            vq = vq.where(models.Violation.status == status)
+        if severity_gte is not None and severity_gte.upper() != "ALL":
+            if severity_gte.upper() not in _SEVERITY_ORDER:
+                raise HTTPException(status_code=400, detail=f"Unknown severity: {severity_gte}")
+            cutoff = _SEVERITY_ORDER.index(severity_gte.upper())
+            vq = vq.where(models.Violation.severity.in_(_SEVERITY_ORDER[: cutoff + 1]))
+        violations = (await db.execute(vq)).scalars().all()
+    else:
+        violations = inspection.violations
+
     report_data = None
     if inspection.report:
-        import json
         try:
-            report_data = json.loads(inspection.report.content) if inspection.report.content else None
+            report_data = orjson.loads(inspection.report.content) if inspection.report.content else None
         except Exception:
             report_data = None
 
     return InspectionDetailOut(
         **InspectionOut.model_validate(inspection).model_dump(),
-        violations=[ViolationOut.model_validate(v) for v in inspection.violations],
+        violations=_VIOLATIONS_ADAPTER.validate_python(
+            violations, from_attributes=True
+        ),
         report=report_data,
     )
 
 
+# Declared before the single-violation route so "bulk" isn't captured
+# as a violation_id
+@router.patch("/{inspection_id}/violations/bulk")
+def bulk_update_violations(
+    inspection_id: str,
+    body: list[BulkViolationUpdate],
+    db: Session = Depends(get_db),
+):
+    """
+    Apply ticket updates to many violations in one request.
+
+    The Nova Act filer used to PATCH each violation individually — one
+    network round trip and one transaction per ticket. This takes the
+    whole batch in a single transaction.
+    """
+    by_id = {item.id: item for item in body}
+    violations = (
+        db.query(models.Violation)
+        .filter(
+            models.Violation.inspection_id == inspection_id,
+            models.Violation.id.in_(by_id),
+        )
+        .all()
+    )
+    for violation in violations:
+        item = by_id[violation.id]
+        for field, value in item.model_dump(exclude_unset=True, exclude={"id"}).items():
+            setattr(violation, field, value)
+    db.commit()
+    return {"updated": len(violations), "requested": len(body)}
+
+
 @router.patch("/{inspection_id}/violations/{violation_id}", response_model=ViolationOut)
 def update_violation(
     inspection_id: str,
@@ -228,7 +348,7 @@ def delete_inspection(inspection_id: str, db: Session = Depends(get_db)):
 
 def _run_analysis_pipeline(inspection_id: str, image_paths: list[str], video_paths: list[str] = None):
     """
-    Runs synchronously in a background thread (FastAPI BackgroundTasks).
+    Runs synchronously in a pipeline worker process.
     Step 0: Extract frames from any uploaded videos
     Step 1: Nova Pro analyzes all images → raw observations
     Step 2: Nova Lite maps to OSHA codes + severity
@@ -250,12 +370,44 @@ def _run_analysis_pipeline(inspection_id: str, image_paths: list[str], video_pat
         # ── Step 0: Extract video frames ───────────────────────────────────
         all_image_paths = list(image_paths)
         if video_paths:
-            for video_path in video_paths:
-                frames_dir = str(Path(video_path).parent / "frames" / Path(video_path).stem)
-                logger.info(f"[{inspection_id}] Extracting frames from {Path(video_path).name}")
-                frames = extract_frames(video_path, frames_dir)
+            frames_dirs = [
+                str(Path(v).parent / "frames" / Path(v).stem) for v in video_paths
+            ]
+            if len(video_paths) > 1:
+                # Decode is CPU-bound — extract each video in its own
+                # process, capped to leave cores for the API process
+                workers = min(len(video_paths), max(1, (os.cpu_count() or 2) // 2))
+                logger.info(
+                    f"[{inspection_id}] Extracting frames from {len(video_paths)} videos "
+                    f"across {workers} processes"
+                )
+                with ProcessPoolExecutor(max_workers=workers) as ex:
+                    per_video = list(ex.map(extract_frames, video_paths, frames_dirs))
+            else:
+                logger.info(f"[{inspection_id}] Extracting frames from {Path(video_paths[0]).name}")
+                per_video = [extract_frames(video_paths[0], frames_dirs[0])]
+
+            for video_path, frames in zip(video_paths, per_video):
                 all_image_paths.extend(frames)
-                logger.info(f"[{inspection_id}] Got {len(frames)} frames from video")
+                logger.info(
+                    f"[{inspection_id}] Got {len(frames)} frames from {Path(video_path).name}"
+                )
+
+        # Burst-mode phone captures repeat byte-identical frames — analyze
+        # each unique image once and drop the rest
+        seen_hashes = set()
+        unique_paths = []
+        for p in all_image_paths:
+            digest = hashlib.sha256(Path(p).read_bytes()).digest()
+            if digest in seen_hashes:
+                continue
+            seen_hashes.add(digest)
+            unique_paths.append(p)
+        if len(unique_paths) < len(all_image_paths):
+            logger.info(
+                f"[{inspection_id}] Skipping {len(all_image_paths) - len(unique_paths)} duplicate image(s)"
+            )
+        all_image_paths = unique_paths
 
         if not all_image_paths:
             inspection.status = "completed"
@@ -264,7 +416,7 @@ def _run_analysis_pipeline(inspection_id: str, image_paths: list[str], video_pat
 
         # ── Step 1: Image Analysis ─────────────────────────────────────────
         logger.info(f"[{inspection_id}] Step 1: Analyzing {len(all_image_paths)} images with Nova Pro")
-        analyzer = ImageAnalyzer()
+        analyzer = get_image_analyzer()
         image_paths = all_image_paths
         raw_observations = analyzer.analyze_multiple(image_paths)
         logger.info(f"[{inspection_id}] Found {len(raw_observations)} raw observations")
@@ -276,30 +428,33 @@ def _run_analysis_pipeline(inspection_id: str, image_paths: list[str], video_pat
 
         # ── Step 2: OSHA Mapping ───────────────────────────────────────────
         logger.info(f"[{inspection_id}] Step 2: Mapping to OSHA codes with Nova Lite")
-        mapper = OSHAMapper()
-        violations_data = mapper.map_violations(raw_observations)
+        mapper = get_osha_mapper()
+        # Batch inference at ~half the on-demand cost when the observation
+        # set clears bedrock_batch_threshold and the S3 bucket + IAM role
+        # are configured; falls straight through to map_violations otherwise
+        violations_data = mapper.map_violations_batch(raw_observations)
         logger.info(f"[{inspection_id}] Mapped {len(violations_data)} violations")
 
-        # Persist violations
-        counts = {"CRITICAL": 0, "HIGH": 0, "MEDIUM": 0, "LOW": 0}
+        # Persist violations — one executemany INSERT instead of an ORM
+        # add() per row, which matters when a video yields hundreds
+        counts = Counter(item.get("severity", "LOW") for item in violations_data)
+        rows = []
         for item in violations_data:
-            sev = item.get("severity", "LOW")
-            counts[sev] = counts.get(sev, 0) + 1
-
-            v = models.Violation(
-                inspection_id=inspection_id,
-                image_index=item.get("image_index"),
-                raw_observation=item.get("original_observation"),
-                hazard_type=item.get("hazard_type"),
-                location_in_image=item.get("location", ""),
-                osha_code=item.get("osha_code"),
-                osha_title=item.get("osha_title"),
-                severity=sev,
-                plain_english=item.get("plain_english"),
-                remediation=item.get("remediation"),
-                estimated_fix_time=item.get("estimated_fix_time"),
-            )
-            db.add(v)
+            rows.append({
+                "inspection_id": inspection_id,
+                "image_index": item.get("image_index"),
+                "raw_observation": item.get("original_observation"),
+                "hazard_type": item.get("hazard_type"),
+                "location_in_image": item.get("location", ""),
+                "osha_code": item.get("osha_code"),
+                "osha_title": item.get("osha_title"),
+                "severity": item.get("severity", "LOW"),
+                "plain_english": item.get("plain_english"),
+                "remediation": item.get("remediation"),
+                "estimated_fix_time": item.get("estimated_fix_time"),
+            })
+        if rows:
+            db.execute(insert(models.Violation), rows)
 
         inspection.total_violations = len(violations_data)
         inspection.critical_count = counts["CRITICAL"]
@@ -310,7 +465,7 @@ def _run_analysis_pipeline(inspection_id: str, image_paths: list[str], video_pat
 
         # ── Step 3: Report Generation ──────────────────────────────────────
         logger.info(f"[{inspection_id}] Step 3: Generating report with Nova Lite")
-        generator = ReportGenerator()
+        generator = get_report_generator()
         report_data = generator.generate_report(
             violations=violations_data,
             site_name=inspection.site_name,
@@ -318,10 +473,9 @@ def _run_analysis_pipeline(inspection_id: str, image_paths: list[str], video_pat
             inspection_date=inspection.created_at.strftime("%Y-%m-%d"),
         )
 
-        import json
         report = models.Report(
             inspection_id=inspection_id,
-            content=json.dumps(report_data),
+            content=orjson.dumps(report_data).decode(),
             summary=report_data.get("executive_summary", ""),
         )
         db.add(report)
@@ -3,14 +3,14 @@ REST API + WebSocket — Real-Time Monitoring
 Handles video upload for real-time monitoring and live violation broadcasts.
 """
 import os
-import uuid
+import time
 import logging
 import asyncio
 from datetime import datetime
 from pathlib import Path
 from typing import Optional
 
-import aiofiles
+import orjson
 from fastapi import (
     APIRouter,
     Depends,
@@ -23,18 +23,25 @@ from fastapi import (
     WebSocketDisconnect,
 )
 from pydantic import BaseModel
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from app.config import settings
-from app.database import get_db
+from app.database import get_db, get_async_db
 from app import models
 from app.agents.realtime_monitor import RealtimeMonitor, ViolationAlert
+from app.api._uploads import save_upload
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/api/monitoring", tags=["monitoring"])
 
 ALLOWED_VIDEO_TYPES = {"video/mp4", "video/quicktime", "video/x-msvideo", "video/avi"}
 
+# Progress rows are advisory — batch their commits (each one is a WAL
+# fsync) while still broadcasting every tick over the WebSocket
+PROGRESS_COMMIT_INTERVAL = 5.0  # seconds
+
 
 # ─── WebSocket Connection Manager ────────────────────────────────────────────
 
@@ -60,18 +67,25 @@ class ConnectionManager:
 
     async def broadcast(self, session_id: str, message: dict):
         """Send message to all connected clients for this session"""
-        if session_id in self.active_connections:
-            dead_connections = []
-            for connection in self.active_connections[session_id]:
-                try:
-                    await connection.send_json(message)
-                except Exception as e:
-                    logger.error(f"Error broadcasting to WebSocket: {e}")
-                    dead_connections.append(connection)
+        connections = self.active_connections.get(session_id)
+        if not connections:
+            return
+
+        # Serialize once — send_json would json.dumps the same payload per
+        # client — then push to every dashboard concurrently. Text frames:
+        # the dashboard JSON.parses event.data directly.
+        payload = orjson.dumps(message).decode()
+        targets = list(connections)
+        results = await asyncio.gather(
+            *(connection.send_text(payload) for connection in targets),
+            return_exceptions=True,
+        )
 
-            # Clean up dead connections
-            for dead in dead_connections:
-                self.disconnect(dead, session_id)
+        # Clean up dead connections
+        for connection, result in zip(targets, results):
+            if isinstance(result, Exception):
+                logger.error(f"Error broadcasting to WebSocket: {result}")
+                self.disconnect(connection, session_id)
 
 
 manager = ConnectionManager()
@@ -141,17 +155,16 @@ async def start_monitoring_session(
         )
 
     # Create monitoring session record
-    session_id = str(uuid.uuid4())
+    session_id = models.new_id()
     session_dir = Path(settings.upload_dir) / "monitoring" / session_id
     session_dir.mkdir(parents=True, exist_ok=True)
 
     video_filename = f"{session_id}_{video.filename}"
     video_path = session_dir / video_filename
 
-    # Save video file
-    async with aiofiles.open(video_path, "wb") as f:
-        content = await video.read()
-        await f.write(content)
+    # Save video file — one thread hop for the whole chunked copy, so a
+    # multi-GB upload never sits fully in memory or blocks the loop
+    await asyncio.to_thread(save_upload, video.file, video_path)
 
     logger.info(f"Video uploaded for monitoring: {video_path}")
 
@@ -175,31 +188,35 @@ async def start_monitoring_session(
 
 
 @router.get("", response_model=list[MonitoringSessionOut])
-def list_monitoring_sessions(db: Session = Depends(get_db)):
+async def list_monitoring_sessions(db: AsyncSession = Depends(get_async_db)):
     """Get all monitoring sessions"""
-    sessions = db.query(models.MonitoringSession).order_by(models.MonitoringSession.created_at.desc()).all()
-    return sessions
+    result = await db.execute(
+        select(models.MonitoringSession).order_by(models.MonitoringSession.created_at.desc())
+    )
+    return result.scalars().all()
 
 
 @router.get("/{session_id}", response_model=MonitoringSessionOut)
-def get_monitoring_session(session_id: str, db: Session = Depends(get_db)):
+async def get_monitoring_session(session_id: str, db: AsyncSession = Depends(get_async_db)):
     """Get details of a specific monitoring session"""
-    session = db.query(models.MonitoringSession).filter(models.MonitoringSession.id == session_id).first()
+    result = await db.execute(
+        select(models.MonitoringSession).where(models.MonitoringSession.id == session_id)
+    )
+    session = result.scalars().first()
     if not session:
         raise HTTPException(status_code=404, detail="Monitoring session not found")
     return session
 
 
 @router.get("/{session_id}/violations", response_model=list[ViolationOut])
-def get_session_violations(session_id: str, db: Session = Depends(get_db)):
+async def get_session_violations(session_id: str, db: AsyncSession = Depends(get_async_db)):
     """Get all violations detected in this monitoring session"""
-    violations = (
-        db.query(models.Violation)
-        .filter(models.Violation.monitoring_session_id == session_id)
+    result = await db.execute(
+        select(models.Violation)
+        .where(models.Violation.monitoring_session_id == session_id)
         .order_by(models.Violation.detection_timestamp)
-        .all()
     )
-    return violations
+    return result.scalars().all()
 
 
 @router.post("/{session_id}/pause")
@@ -333,13 +350,28 @@ async def _run_monitoring_pipeline(session_id: str, video_path: str, db: Session
     monitor = RealtimeMonitor()
     active_monitors[session_id] = monitor
 
+    # Ticket filing runs as fire-and-forget tasks so its latency (network
+    # round-trip, or the demo's simulated delay) never stalls frame analysis
+    ticket_tasks: set[asyncio.Task] = set()
+
+    async def _file_and_record(alert: ViolationAlert, violation: models.Violation):
+        try:
+            ticket_id = await _auto_file_ticket(alert, session_id)
+            if ticket_id:
+                violation.ticket_id = ticket_id
+                violation.status = "in_progress"
+                db.commit()
+                logger.info(f"Auto-filed ticket {ticket_id} for violation {alert.violation_id}")
+        except Exception as e:
+            logger.error(f"Failed to auto-file ticket: {e}")
+
     # Callback for violations
     async def on_violation_detected(alert: ViolationAlert):
         logger.info(f"Broadcasting violation: {alert.violation_id}")
 
         # Create inspection record (for compatibility with existing system)
         inspection = models.Inspection(
-            id=str(uuid.uuid4()),
+            id=models.new_id(),
             site_name=f"Real-Time Monitor {session_id[:8]}",
             location="Live CCTV",
             inspector_name="AI Monitor",
@@ -368,21 +400,23 @@ async def _run_monitoring_pipeline(session_id: str, video_path: str, db: Session
         )
         db.add(violation)
 
-        # Update session violation count
-        session.violations_detected_count += 1
+        # Update session violation count server-side — an atomic UPDATE
+        # can't race the concurrent ticket tasks the way the ORM's
+        # read-modify-write on the loaded row could
+        db.execute(
+            update(models.MonitoringSession)
+            .where(models.MonitoringSession.id == session_id)
+            .values(
+                violations_detected_count=models.MonitoringSession.violations_detected_count + 1
+            )
+        )
         db.commit()
 
         # Auto-file ticket if enabled and severity is CRITICAL or HIGH
         if session.auto_ticket_filing and alert.severity in ["CRITICAL", "HIGH"]:
-            try:
-                ticket_id = await _auto_file_ticket(alert, session_id)
-                if ticket_id:
-                    violation.ticket_id = ticket_id
-                    violation.status = "in_progress"
-                    db.commit()
-                    logger.info(f"Auto-filed ticket {ticket_id} for violation {alert.violation_id}")
-            except Exception as e:
-                logger.error(f"Failed to auto-file ticket: {e}")
+            task = asyncio.create_task(_file_and_record(alert, violation))
+            ticket_tasks.add(task)
+            task.add_done_callback(ticket_tasks.discard)
 
         # Broadcast via WebSocket
         await manager.broadcast(session_id, {
@@ -391,10 +425,16 @@ async def _run_monitoring_pipeline(session_id: str, video_path: str, db: Session
         })
 
     # Callback for progress updates
+    last_progress_commit = 0.0
+
     async def on_progress(current_time: float, total_time: float, frame: int):
+        nonlocal last_progress_commit
         session.current_timestamp = current_time
         session.current_frame = frame
-        db.commit()
+        now = time.monotonic()
+        if now - last_progress_commit >= PROGRESS_COMMIT_INTERVAL:
+            db.commit()
+            last_progress_commit = now
 
         # Broadcast progress
         await manager.broadcast(session_id, {
@@ -417,6 +457,10 @@ async def _run_monitoring_pipeline(session_id: str, video_path: str, db: Session
             on_progress=on_progress,
         )
 
+        # Let any in-flight ticket filings land before declaring done
+        if ticket_tasks:
+            await asyncio.gather(*ticket_tasks, return_exceptions=True)
+
         # Mark as completed
         session.status = "completed"
         session.completed_at = datetime.utcnow()
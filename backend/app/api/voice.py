@@ -8,30 +8,60 @@ Two endpoints:
 
 Nova Sonic WebSocket protocol
   Browser → Backend:
-    Binary frames  : raw PCM 16-bit mono 16 kHz audio chunks
-    Text "end"     : signals end of speech turn
-
-  Backend → Browser:
-    {"type":"text",   "content":"transcript or response text"}
-    {"type":"audio",  "content":"<base64 PCM 24kHz>"}
-    {"type":"error",  "content":"error message"}
-    {"type":"status", "content":"connected|processing|done"}
+    Binary frames     : raw PCM 16-bit mono 16 kHz audio chunks
+    Text "end"        : signals end of speech turn
+    Text {"codec":..} : optional — "mulaw" switches binary frames to G.711
+                        μ-law (half the bytes of PCM16, decoded server-side)
+
+  Backend → Browser (all binary frames; branch on the first byte):
+    0x01 frames : raw PCM 16-bit mono 24 kHz response audio — one tag
+      byte followed by the samples. No base64, no JSON: clients feed
+      the payload straight to the playback buffer.
+    Other frames (first byte "{"): orjson {"type":"batch","events":[...]}
+      — coalesced burst of the event objects below
+    Event objects:
+      {"type":"text",   "content":"transcript or response text"}
+      {"type":"error",  "content":"error message"}
+      {"type":"status", "content":"connected|processing|backpressure|done"}
 """
 
 import asyncio
-import json
 import logging
+from collections import deque
 from typing import Optional
 
+import orjson
+import pybase64
+
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect
 from pydantic import BaseModel
 
-from app.agents.voice_agent import VoiceAgent
+try:
+    import audioop  # stdlib through 3.12 — needed only for μ-law clients
+except ImportError:
+    audioop = None
+
+from app.agents import get_voice_agent
 from app.agents.nova_sonic_agent import NovaSonicSession
 
 logger = logging.getLogger(__name__)
 router = APIRouter(tags=["voice"])
 
+# How long the Sonic writer waits after the first ready event for more of
+# the same burst before flushing one batched WebSocket frame
+COALESCE_WINDOW = 0.005  # seconds
+
+# First byte of a raw-PCM downlink frame. Bedrock hands audio to us as
+# base64; decoding once here and shipping raw bytes saves the 33% base64
+# inflation on the wire plus a decode pass in the browser.
+AUDIO_FRAME_TAG = b"\x01"
+
+# Exactly 20 ms of uplink audio at 16 kHz mono PCM16. Browsers deliver
+# whatever their capture buffer holds (ScriptProcessor: 2048 samples);
+# re-chunking to protocol-aligned frames keeps Nova Sonic's jitter
+# buffer steady and the queue entries uniform.
+PCM_FRAME_BYTES = 640
+
 
 # ─── REST fallback (Nova Lite) ────────────────────────────────────────────────
 
@@ -51,7 +81,7 @@ class VoiceResponse(BaseModel):
 @router.post("/api/voice/chat", response_model=VoiceResponse)
 def voice_chat(req: VoiceRequest):
     """Text-in / text-out via Nova Lite (fallback when mic unavailable)."""
-    agent = VoiceAgent()
+    agent = get_voice_agent()
     result = agent.process_observation(req.text, req.conversation_history)
     return result
 
@@ -75,47 +105,181 @@ async def nova_sonic_websocket(websocket: WebSocket):
     logger.info("Nova Sonic WebSocket connected")
 
     async def send_json(data: dict):
-        await websocket.send_text(json.dumps(data))
+        # orjson emits bytes directly — no str intermediate, no re-encode
+        await websocket.send_bytes(orjson.dumps(data))
 
     await send_json({"type": "status", "content": "connected"})
 
-    try:
+    # Uplink codec for binary frames. PCM16 at 16 kHz is 256 kbps — on a
+    # constrained site network the mic uplink, not the model, becomes the
+    # bottleneck. Clients may negotiate G.711 μ-law (half the bytes, free
+    # to decode) by sending {"codec": "mulaw"} before streaming.
+    codec = "pcm"
+
+    # Sentinel separating turns on the connection-level audio queue; a
+    # plain None still means "connection gone"
+    TURN_END = object()
+
+    # One collector for the connection lifetime: the browser can start
+    # speaking its next turn while the previous response is still
+    # streaming out — chunks queue up here instead of waiting for the
+    # per-turn plumbing to come back around. Bounded for the same
+    # backpressure reasons as the session queue (chunk-sized entries,
+    # ~1.3 s at 20 ms frames).
+    audio_q: asyncio.Queue = asyncio.Queue(maxsize=64)
+    collect_task = None
+
+    async def collect_audio():
+        nonlocal codec
+        chunk_count = 0
+        warned_backpressure = False
+        carry = bytearray()  # sub-frame remainder between messages
         while True:
-            audio_queue: asyncio.Queue = asyncio.Queue()
+            message = await websocket.receive()
+
+            # Hot path first: during speech ~50 binary PCM frames
+            # arrive per second, so one .get() and straight back
+            # to receive() — control frames take the cold branches
+            pcm = message.get("bytes")
+            if pcm:
+                if codec == "mulaw":
+                    pcm = audioop.ulaw2lin(pcm, 2)
+                if audio_q.full() and not warned_backpressure:
+                    # Queue full — put is about to block. Tell the
+                    # client once per turn so it can throttle capture.
+                    warned_backpressure = True
+                    await send_json({"type": "status", "content": "backpressure"})
+                # Re-chunk to whole 20 ms frames; the tail waits in
+                # carry for the next message
+                carry.extend(pcm)
+                while len(carry) >= PCM_FRAME_BYTES:
+                    await audio_q.put(bytes(carry[:PCM_FRAME_BYTES]))
+                    del carry[:PCM_FRAME_BYTES]
+                    chunk_count += 1
+                continue
 
-            # ── Collect audio from browser until "end" ────────────────────
-            async def collect_audio():
-                chunk_count = 0
-                while True:
-                    message = await websocket.receive()
+            text = message.get("text")
+            if text:
+                text = text.strip()
+                if text.lower() == "end":
+                    if carry:
+                        # Zero-pad the remainder up to a whole frame
+                        carry.extend(b"\x00" * (-len(carry) % PCM_FRAME_BYTES))
+                        await audio_q.put(bytes(carry))
+                        carry.clear()
+                        chunk_count += 1
+                    # Per-turn summary is hot-path noise at INFO —
+                    # lazy %-format also skips the string build when
+                    # DEBUG is off
+                    logger.debug("Turn: received %d audio chunks", chunk_count)
+                    await audio_q.put(TURN_END)
+                    chunk_count = 0
+                    warned_backpressure = False
+                    continue
+                if text.startswith("{"):
+                    requested = orjson.loads(text).get("codec", "pcm")
+                    if requested == "mulaw" and audioop is None:
+                        logger.warning("μ-law requested but audioop unavailable; staying on PCM")
+                        requested = "pcm"
+                    codec = requested
+                continue
 
-                    if message["type"] == "websocket.disconnect":
-                        await audio_queue.put(None)
-                        return
+            if message["type"] == "websocket.disconnect":
+                await audio_q.put(None)
+                return
 
-                    if "bytes" in message and message["bytes"]:
-                        await audio_queue.put(message["bytes"])
-                        chunk_count += 1
+    async def pump_turn(session):
+        """Feed queued audio into one session until the turn (or WS) ends."""
+        while True:
+            chunk = await audio_q.get()
+            if chunk is TURN_END or chunk is None:
+                await session.feed_audio(None)  # close signal for Nova Sonic
+                return
+            await session.feed_audio(chunk)
 
-                    elif "text" in message and message["text"].strip().lower() == "end":
-                        logger.info(f"Turn: received {chunk_count} audio chunks")
-                        await audio_queue.put(None)  # close signal for Nova Sonic
-                        return
+    try:
+        collect_task = asyncio.create_task(collect_audio())
 
-            collect_task = asyncio.create_task(collect_audio())
+        # One session object for the connection — new_turn() regenerates
+        # the per-prompt state between turns while keeping the boto3
+        # client and its warm connection pool
+        session = NovaSonicSession()
+
+        while True:
+            # Session owns the audio queue (janus: async in, sync out to the
+            # Bedrock worker thread); pump_turn bridges this turn's slice of
+            # the connection queue into it
+            pump_task = asyncio.create_task(pump_turn(session))
             await send_json({"type": "status", "content": "processing"})
 
             # ── Stream to Nova Sonic and forward responses ────────────────
-            session = NovaSonicSession()
+            # Sonic output is bursty (many small text deltas + audio
+            # chunks); a writer task coalesces everything that arrives
+            # within a short window into one binary frame, so the burst
+            # costs one send/syscall instead of one per event.
+            out_q: asyncio.Queue = asyncio.Queue()
+
+            async def flush_events(events: list):
+                # Audio goes out as tagged raw-PCM frames (adjacent chunks
+                # concatenate — PCM has no framing), everything else as one
+                # orjson batch; switches between the two preserve ordering
+                batch = []
+                pcm = bytearray()
+                for ev in events:
+                    if ev.get("type") == "audio":
+                        if batch:
+                            await websocket.send_bytes(orjson.dumps({"type": "batch", "events": batch}))
+                            batch = []
+                        pcm += pybase64.b64decode(ev["content"])
+                    else:
+                        if pcm:
+                            await websocket.send_bytes(AUDIO_FRAME_TAG + bytes(pcm))
+                            pcm.clear()
+                        batch.append(ev)
+                if pcm:
+                    await websocket.send_bytes(AUDIO_FRAME_TAG + bytes(pcm))
+                if batch:
+                    await websocket.send_bytes(orjson.dumps({"type": "batch", "events": batch}))
+
+            async def forward_events():
+                while True:
+                    first = await out_q.get()
+                    if first is None:
+                        return
+                    await asyncio.sleep(COALESCE_WINDOW)
+                    events = [first]
+                    done = False
+                    while True:
+                        try:
+                            nxt = out_q.get_nowait()
+                        except asyncio.QueueEmpty:
+                            break
+                        if nxt is None:
+                            done = True
+                            break
+                        events.append(nxt)
+                    await flush_events(events)
+                    if done:
+                        return
+
+            writer_task = asyncio.create_task(forward_events())
             try:
-                async for event in session.run(audio_queue):
-                    await send_json(event)
+                async for event in session.run():
+                    await out_q.put(event)
             except Exception as e:
-                logger.error(f"Nova Sonic stream error: {e}", exc_info=True)
-                await send_json({"type": "error", "content": str(e)})
+                logger.error("Nova Sonic stream error: %s", e, exc_info=True)
+                await out_q.put({"type": "error", "content": str(e)})
+
+            await out_q.put({"type": "status", "content": "done"})
+            await out_q.put(None)
+            await writer_task
+            await pump_task
+
+            if collect_task.done():
+                # Collector saw the disconnect — no further turns coming
+                break
 
-            await send_json({"type": "status", "content": "done"})
-            await collect_task
+            session.new_turn()
 
     except WebSocketDisconnect:
         logger.info("Nova Sonic WebSocket disconnected")
@@ -125,6 +289,9 @@ async def nova_sonic_websocket(websocket: WebSocket):
             await send_json({"type": "error", "content": str(e)})
         except Exception:
             pass
+    finally:
+        if collect_task is not None:
+            collect_task.cancel()
 
 
 # ─── Legacy text WebSocket (Nova Lite) ───────────────────────────────────────
@@ -138,31 +305,33 @@ async def voice_text_websocket(websocket: WebSocket):
     Server sends: {"spoken_response": "...", "severity": "HIGH", ...}
     """
     await websocket.accept()
-    agent = VoiceAgent()
-    history: list[dict] = []
+    agent = get_voice_agent()
+    # Bounded deque trims itself in O(1) — no history[-10:] copy per turn
+    history: deque = deque(maxlen=10)
     logger.info("Legacy text voice WebSocket connected")
 
     try:
         while True:
             raw  = await websocket.receive_text()
-            data = json.loads(raw)
+            data = orjson.loads(raw)
             text = data.get("text", "").strip()
             if not text:
                 continue
 
             try:
-                result = agent.process_observation(text, history)
+                result = agent.process_observation(text, list(history))
                 history.append({"role": "user",      "content": [{"text": text}]})
                 history.append({"role": "assistant",  "content": [{"text": result["spoken_response"]}]})
-                history = history[-10:]
-                await websocket.send_text(json.dumps(result))
+                # Legacy clients expect text frames — serialize with
+                # orjson but decode rather than switching to binary
+                await websocket.send_text(orjson.dumps(result).decode())
             except Exception as e:
-                logger.error(f"Voice text error: {e}")
-                await websocket.send_text(json.dumps({
+                logger.error("Voice text error: %s", e)
+                await websocket.send_text(orjson.dumps({
                     "spoken_response": "Error processing that. Please try again.",
                     "severity": None, "osha_code": None,
                     "original_text": text, "is_violation": False,
-                }))
+                }).decode())
 
     except WebSocketDisconnect:
         logger.info("Legacy voice WebSocket disconnected")
@@ -17,6 +17,34 @@ class Settings(BaseSettings):
     use_s3: bool = False
     s3_bucket: str = ""
 
+    # Bedrock batch inference (CreateModelInvocationJob) — needs an S3 bucket
+    # for job input/output and an IAM role Bedrock can assume.
+    bedrock_batch_role_arn: str = ""
+    bedrock_batch_threshold: int = 50   # min observations before batch beats on-demand
+
+    # Bedrock inference tuning
+    # Latency-optimized profiles are only offered in some regions (e.g.
+    # us-east-2) — leave off unless the deployment region supports them.
+    bedrock_latency_optimized: bool = False
+
+    # Size of the shared thread pool for blocking Bedrock calls
+    # (0 = cpu_count * 5)
+    max_parallel_bedrock: int = 0
+
+    # Serve repeated identical prompts (retries, demos, stock voice
+    # phrases) from in-process LRU caches instead of re-invoking Bedrock
+    enable_bedrock_cache: bool = True
+
+    # Longest edge images are shrunk to before upload. 1568 matches Nova
+    # Pro's internal resolution; drop to ~1024 to trade some detail for
+    # smaller payloads and fewer image tokens.
+    max_image_edge: int = 1568
+
+    # Comma-separated regions to spread Bedrock calls across (empty = just
+    # aws_region). Each region has its own per-model TPM quota, so rotating
+    # raises the throttling ceiling for concurrent image fan-out.
+    bedrock_regions: str = ""
+
     # Nova model IDs
     nova_pro_model_id: str   = "amazon.nova-pro-v1:0"     # multimodal image analysis
     nova_lite_model_id: str  = "amazon.nova-lite-v1:0"    # OSHA mapping + reports
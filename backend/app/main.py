@@ -1,6 +1,17 @@
 import logging
+import logging.handlers
 import os
 from pathlib import Path
+from queue import SimpleQueue
+
+try:
+    # libuv-backed event loop — meaningfully faster socket reads/writes,
+    # which the Sonic WebSocket's small-binary-frame traffic feels most.
+    # Must be installed before uvicorn creates the loop.
+    import uvloop
+    uvloop.install()
+except ImportError:  # Windows / uvloop not installed — stock asyncio is fine
+    uvloop = None
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
@@ -16,6 +27,18 @@ logging.basicConfig(
     level=logging.INFO,
     format="%(asctime)s  %(levelname)-8s  %(name)s — %(message)s",
 )
+
+# Route records through a queue drained by a dedicated listener thread —
+# the stderr write (and its lock) happens off the event loop, so a slow
+# terminal or piped log can't stall request handling.
+_log_queue: SimpleQueue = SimpleQueue()
+_root_logger = logging.getLogger()
+_log_listener = logging.handlers.QueueListener(
+    _log_queue, *_root_logger.handlers, respect_handler_level=True
+)
+_root_logger.handlers = [logging.handlers.QueueHandler(_log_queue)]
+_log_listener.start()
+
 logger = logging.getLogger(__name__)
 
 app = FastAPI(
@@ -41,7 +64,34 @@ app.include_router(monitoring_router)
 # ─── Static file serving for uploaded media ──────────────────────────────────
 uploads_dir = Path(settings.upload_dir)
 uploads_dir.mkdir(exist_ok=True)
-app.mount("/uploads", StaticFiles(directory=str(uploads_dir)), name="uploads")
+
+if settings.use_s3:
+    # S3 mode: media present on local disk (the upload path writes there
+    # regardless) is served directly; anything else gets a short-lived
+    # presigned GET so the browser pulls it straight from S3, keeping
+    # bulk bytes off the Python event loop. The redirect assumes objects
+    # are mirrored under keys matching their /uploads/... paths — until a
+    # writer does that, the disk check keeps every stored URL working.
+    import boto3
+    from fastapi.responses import FileResponse, RedirectResponse
+
+    _s3 = boto3.client("s3", region_name=settings.aws_region)
+
+    @app.get("/uploads/{file_path:path}")
+    def uploaded_media(file_path: str):
+        local = (uploads_dir / file_path).resolve()
+        if local.is_file() and local.is_relative_to(uploads_dir.resolve()):
+            return FileResponse(local)
+        url = _s3.generate_presigned_url(
+            "get_object",
+            Params={"Bucket": settings.s3_bucket, "Key": file_path},
+            ExpiresIn=3600,
+        )
+        return RedirectResponse(url, status_code=307)
+else:
+    # Local/dev mode: Starlette streams the files itself. Behind a reverse
+    # proxy, point Nginx at upload_dir and let it sendfile /uploads instead.
+    app.mount("/uploads", StaticFiles(directory=str(uploads_dir)), name="uploads")
 
 
 @app.on_event("startup")
@@ -1,12 +1,15 @@
 import uuid
 from datetime import datetime
-from sqlalchemy import Column, String, Integer, DateTime, ForeignKey, Text, Boolean, Float
+from sqlalchemy import Column, String, Integer, DateTime, ForeignKey, Text, Boolean, Float, Index
 from sqlalchemy.orm import relationship
 from app.database import Base
 
 
 def new_id() -> str:
-    return str(uuid.uuid4())
+    # Hex form (32 chars) over the hyphenated 36-char str(uuid4()) —
+    # smaller B-tree keys and denser index pages for the per-frame
+    # Violation writes. Existing hyphenated ids stay valid Strings.
+    return uuid.uuid4().hex
 
 
 class Inspection(Base):
@@ -51,7 +54,7 @@ class MonitoringSession(Base):
     id = Column(String, primary_key=True, default=new_id)
     video_file_path = Column(String, nullable=False)
     original_filename = Column(String, nullable=True)
-    status = Column(String, default="pending")  # pending | processing | paused | completed | failed
+    status = Column(String, default="pending", index=True)  # pending | processing | paused | completed | failed
 
     # Video metadata
     frame_rate = Column(Float, nullable=True)
@@ -76,6 +79,14 @@ class MonitoringSession(Base):
 
 class Violation(Base):
     __tablename__ = "violations"
+    __table_args__ = (
+        # get_session_violations filters on session + orders by timestamp;
+        # detail views fetch by inspection, the ticket filer additionally
+        # by status — all full scans without these (the composite also
+        # serves inspection-only lookups via its leading column)
+        Index("ix_violation_monitoring_ts", "monitoring_session_id", "detection_timestamp"),
+        Index("ix_violation_inspection_status", "inspection_id", "status"),
+    )
 
     id = Column(String, primary_key=True, default=new_id)
     inspection_id = Column(String, ForeignKey("inspections.id"), nullable=False)
@@ -89,14 +100,14 @@ class Violation(Base):
     # OSHA mapping from Nova Lite
     osha_code = Column(String, nullable=True)
     osha_title = Column(String, nullable=True)
-    severity = Column(String, nullable=True)  # CRITICAL | HIGH | MEDIUM | LOW
+    severity = Column(String, nullable=True, index=True)  # CRITICAL | HIGH | MEDIUM | LOW
     plain_english = Column(Text, nullable=True)
     remediation = Column(Text, nullable=True)
     estimated_fix_time = Column(String, nullable=True)
 
     # Ticket filing
     status = Column(String, default="open")  # open | in_progress | resolved
-    ticket_id = Column(String, nullable=True)
+    ticket_id = Column(String, nullable=True, index=True)
     ticket_url = Column(String, nullable=True)
     assigned_to = Column(String, nullable=True)
 
@@ -4,7 +4,8 @@
  * Audio pipeline (Nova Sonic mode):
  *   Mic → AudioContext → ScriptProcessor → downsample to 16kHz → Int16 PCM
  *   → binary WebSocket frames → backend → Nova 2 Sonic (Bedrock)
- *   → base64 PCM 24kHz → decode → AudioContext → speaker
+ *   → binary frames back: 0x01-tagged raw PCM 24kHz → AudioContext → speaker,
+ *     everything else an orjson {"type":"batch","events":[...]} frame
  *
  * Fallback (text mode):
  *   Text input → POST /api/voice/chat → Nova Lite → text response + browser TTS
@@ -55,16 +56,12 @@ function toInt16(buf: Float32Array): Int16Array {
   return out
 }
 
-async function playPCMBase64(
-  b64: string,
+function playPCM(
+  bytes: Uint8Array,
   ctx: AudioContext,
   nextAt: React.MutableRefObject<number>
 ) {
-  const bin   = atob(b64)
-  const bytes = new Uint8Array(bin.length)
-  for (let i = 0; i < bin.length; i++) bytes[i] = bin.charCodeAt(i)
-
-  const i16   = new Int16Array(bytes.buffer)
+  const i16   = new Int16Array(bytes.buffer, bytes.byteOffset, bytes.byteLength >> 1)
   const f32   = new Float32Array(i16.length)
   for (let i = 0; i < i16.length; i++) f32[i] = i16[i] / 32768
 
@@ -112,6 +109,7 @@ export default function VoiceAssistant({ onClose }: Props) {
     return new Promise((resolve, reject) => {
       const proto = window.location.protocol === 'https:' ? 'wss:' : 'ws:'
       const ws    = new WebSocket(`${proto}//${window.location.host}/ws/sonic`)
+      ws.binaryType = 'arraybuffer'  // backend sends binary frames only
       wsRef.current = ws
 
       ws.onopen = () => resolve(ws)
@@ -120,9 +118,7 @@ export default function VoiceAssistant({ onClose }: Props) {
         setTextMode(true)
       }
 
-      ws.onmessage = (e) => {
-        const msg: { type: string; content: string } = JSON.parse(e.data)
-
+      const handleEvent = (msg: { type: string; content: string }) => {
         if (msg.type === 'status') {
           if (msg.content === 'processing') setStatus('processing')
           if (msg.content === 'done') {
@@ -135,9 +131,6 @@ export default function VoiceAssistant({ onClose }: Props) {
               pendingText.current = ''
             }
           }
-        } else if (msg.type === 'audio') {
-          setStatus('speaking')
-          if (audioCtxRef.current) playPCMBase64(msg.content, audioCtxRef.current, nextAt)
         } else if (msg.type === 'text') {
           pendingText.current += msg.content
         } else if (msg.type === 'error') {
@@ -146,6 +139,22 @@ export default function VoiceAssistant({ onClose }: Props) {
         }
       }
 
+      ws.onmessage = (e) => {
+        const buf = new Uint8Array(e.data as ArrayBuffer)
+
+        // 0x01-tagged frames carry raw PCM 24kHz — no base64, no JSON.
+        // slice() realigns the samples to offset 0 for the Int16Array view.
+        if (buf[0] === 0x01) {
+          setStatus('speaking')
+          if (audioCtxRef.current) playPCM(buf.slice(1), audioCtxRef.current, nextAt)
+          return
+        }
+
+        // Everything else is an orjson batch of coalesced events
+        const msg = JSON.parse(new TextDecoder().decode(buf))
+        for (const ev of msg.events ?? [msg]) handleEvent(ev)
+      }
+
       ws.onclose = () => { setStatus('idle'); setRecording(false) }
     })
   }, [])